@@ -1,19 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import AsyncIterator, Awaitable, Callable, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
+from app.config import ANALYZE_BATCH_MAX_TEXTS, TRANSLATION_JOB_MAX_CHARS, WORD_LOOKUP_MAX_WORDS
 from app.database import get_db
 from app.schemas import (
-    AnalyzeRequest, AnalyzeResponse,
-    WordResponse, KanjiResponse,
-    TranslateRequest, TranslateResponse,
-    HealthResponse
+    AnalyzeRequest, AnalyzeResponse, AnalyzeStreamRequest, SentenceTokens,
+    BatchAnalyzeRequest, BatchAnalyzeResponse, EnrichedAnalyzeResponse,
+    DocumentRequest, DocumentEditRequest, DocumentResponse, DocumentDiffResponse,
+    WordResponse, WordLookupRequest, WordLookupResponse, KanjiResponse,
+    SearchResponse, TranslateRequest, TranslateResponse, TranslateDelta,
+    TranslationJobRequest, TranslationJobResponse,
+    AnalyzerPoolStats, DiskCacheStats, TranslationBackendStats, HealthResponse
 )
-from app.services.analyzer import get_analyzer
+from app.services.analysis_cache import get_analysis_cache
+from app.services.analyzer import (
+    analyze_async, analyze_batch, analyze_columnar_async, get_tagger_pool, split_sentences
+)
+from app.services.cache import get_cache_stats
 from app.services.dictionary import DictionaryService
-from app.services.kanji import KanjiService
-from app.services.translator import get_translator
+from app.services.documents import AnalyzedDocument, DocumentVersionConflict, document_store
+from app.services.jobs import TranslationJobService, job_runner
+from app.services.kanji import KanjiService, extract_kanji
+from app.services.kanji_index import get_kanji_index
+from app.services.search import SearchService
+from app.services.translation_cache import get_translation_cache, translate_cached, translate_stream_cached
+from app.services.translator import get_translator, get_translator_stats
 
 router = APIRouter()
 
+# Token POS values that never have dictionary entries
+NON_LEXICAL_POS = {"補助記号", "空白"}
+
+
+async def _cached_analysis(kind: str, text: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+    """
+    Get a serialized analysis result from the cache, or render and store it
+
+    Bodies are serialized response models, returned as they are; FastAPI
+    does not validate them against the route's response_model again.
+    """
+    cache = get_analysis_cache()
+    if cache.disk is None:
+        body = cache.get(kind, text)
+    else:
+        # Disk lookups (SQLite and decompression) stay off the event loop
+        body = await run_in_threadpool(cache.get, kind, text)
+    if body is None:
+        body = await render()
+        # Compression and disk writes stay off the event loop
+        await run_in_threadpool(cache.set, kind, text, body)
+    return body
+
 
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_text(request: AnalyzeRequest):
@@ -22,9 +62,184 @@ async def analyze_text(request: AnalyzeRequest):
 
     - **text**: Japanese text to analyze
     """
-    analyzer = get_analyzer()
-    tokens = analyzer.analyze(request.text)
-    return AnalyzeResponse(tokens=tokens)
+    async def render() -> bytes:
+        tokens = await analyze_async(request.text)
+        return AnalyzeResponse(tokens=tokens).model_dump_json().encode("utf-8")
+
+    body = await _cached_analysis("tokens", request.text, render)
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/analyze/columnar")
+async def analyze_text_columnar(request: AnalyzeRequest):
+    """
+    Analyze Japanese text and return tokens as parallel arrays
+
+    Same data as /analyze in a compact layout for large inputs: each of
+    surface, reading, base_form, pos and pos_detail is a list of indexes
+    into strings (pos_detail is -1 when missing), and start/end hold
+    character offsets. Token i is made of entry i of every list.
+
+    - **text**: Japanese text to analyze
+    """
+    async def render() -> bytes:
+        result = await analyze_columnar_async(request.text)
+        # Serialized directly; no Token models are built
+        return json.dumps(result.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    body = await _cached_analysis("columnar", request.text, render)
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/analyze/enriched", response_model=EnrichedAnalyzeResponse)
+async def analyze_text_enriched(request: AnalyzeRequest, db: Session = Depends(get_db)):
+    """
+    Analyze Japanese text and include definitions and kanji details
+
+    Each distinct base form and kanji in the text is looked up once, so a
+    page can be rendered with glosses without any follow-up requests.
+
+    - **text**: Japanese text to analyze
+    """
+    tokens = await analyze_async(request.text)
+    lexical = [token for token in tokens if token.pos not in NON_LEXICAL_POS]
+
+    words = DictionaryService.lookup_words(db, [token.base_form for token in lexical])
+    kanji = KanjiService.lookup_kanji_batch(db, extract_kanji(token.surface for token in lexical))
+
+    return EnrichedAnalyzeResponse(
+        tokens=tokens,
+        words={key: value for key, value in words.items() if value is not None},
+        kanji={key: value for key, value in kanji.items() if value is not None}
+    )
+
+
+@router.post("/analyze/batch", response_model=BatchAnalyzeResponse)
+async def analyze_text_batch(request: BatchAnalyzeRequest):
+    """
+    Analyze many Japanese texts in one request
+
+    Texts are tokenized in parallel on the tagger pool and results are
+    returned in input order.
+
+    - **texts**: List of Japanese texts to analyze
+    """
+    if len(request.texts) > ANALYZE_BATCH_MAX_TEXTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many texts: {len(request.texts)} (max {ANALYZE_BATCH_MAX_TEXTS})"
+        )
+
+    # Texts share cache entries with /analyze; only the misses are tokenized
+    cache = get_analysis_cache()
+    if cache.disk is None:
+        bodies = cache.get_many("tokens", request.texts)
+    else:
+        bodies = await run_in_threadpool(cache.get_many, "tokens", request.texts)
+    missing = list(dict.fromkeys(text for text, body in zip(request.texts, bodies) if body is None))
+
+    if missing:
+        rendered = {
+            text: AnalyzeResponse(tokens=tokens).model_dump_json().encode("utf-8")
+            for text, tokens in zip(missing, await analyze_batch(missing))
+        }
+        await run_in_threadpool(cache.set_many, "tokens", rendered)
+        bodies = [body if body is not None else rendered[text] for text, body in zip(request.texts, bodies)]
+
+    # Every element is a serialized AnalyzeResponse, so the spliced body
+    # matches BatchAnalyzeResponse without building and validating it again
+    return Response(content=b'{"results":[' + b",".join(bodies) + b"]}", media_type="application/json")
+
+
+@router.post("/analyze/stream")
+async def analyze_text_stream(request: AnalyzeStreamRequest):
+    """
+    Analyze Japanese text and stream the result as NDJSON
+
+    The text is split at sentence boundaries and tokenized lazily, so
+    memory stays bounded regardless of document length. Offsets are
+    relative to the whole document.
+
+    - **text**: Japanese text to analyze
+    - **unit**: Emit one line per token (default) or per sentence
+    """
+    # Reject before the response starts; once streaming, sentences wait their turn
+    get_tagger_pool().ensure_capacity()
+
+    async def generate() -> AsyncIterator[str]:
+        for start, sentence in split_sentences(request.text):
+            tokens = await analyze_async(sentence, offset=start, reject=False)
+            if request.unit == "sentence":
+                if tokens:
+                    chunk = SentenceTokens(start=start, end=start + len(sentence), tokens=tokens)
+                    yield chunk.model_dump_json() + "\n"
+            else:
+                for token in tokens:
+                    yield token.model_dump_json() + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.put("/documents/{document_id}", response_model=DocumentResponse)
+async def put_document(document_id: str, request: DocumentRequest):
+    """
+    Analyze a document and keep it for incremental updates
+
+    Replaces any document stored under the same id and resets its version to 0.
+
+    - **document_id**: Client-chosen id (e.g. an editor buffer id)
+    - **text**: Full document text
+    """
+    document = await AnalyzedDocument.analyze(request.text)
+    document_store.put(document_id, document)
+    return DocumentResponse(
+        id=document_id,
+        version=document.version,
+        length=len(document.text),
+        tokens=document.tokens()
+    )
+
+
+@router.post("/documents/{document_id}/edits", response_model=DocumentDiffResponse)
+async def edit_document(document_id: str, request: DocumentEditRequest):
+    """
+    Apply edits to a stored document and return the token changes
+
+    Only the sentences an edit touches are tokenized again. Apply each
+    change to the token list in order: remove `delete` tokens at `index`,
+    insert `tokens`, then add `shift` to the offsets of every later token.
+
+    - **document_id**: Id used with PUT /documents/{document_id}
+    - **version**: Version the edits are based on (409 if outdated)
+    - **edits**: Replacements of text[start:end], applied in order
+    """
+    document = document_store.get(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
+
+    try:
+        version, changes = await document.apply_edits(request.version, request.edits)
+    except DocumentVersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Refresh the expiry of documents still being edited; a concurrent PUT
+    # or DELETE wins over this edit
+    document_store.touch(document_id, document)
+    return DocumentDiffResponse(
+        id=document_id,
+        version=version,
+        length=len(document.text),
+        changes=changes
+    )
+
+
+@router.delete("/documents/{document_id}", status_code=204)
+async def delete_document(document_id: str):
+    """Forget a stored document"""
+    if not document_store.delete(document_id):
+        raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
 
 
 @router.get("/word/{word}", response_model=WordResponse)
@@ -32,14 +247,73 @@ async def get_word_definition(word: str, db: Session = Depends(get_db)):
     """
     Get word definition and information
 
+    Conjugated words (e.g. 食べました) resolve to their dictionary form,
+    with the conjugations listed in the inflection field.
+
     - **word**: Japanese word (kanji or kana)
     """
-    result = DictionaryService.lookup_word(db, word)
+    result = DictionaryService.lookup_inflected(db, [word]).get(word)
     if not result:
         raise HTTPException(status_code=404, detail=f"Word not found: {word}")
     return result
 
 
+@router.post("/words/lookup", response_model=WordLookupResponse)
+async def lookup_words(request: WordLookupRequest, db: Session = Depends(get_db)):
+    """
+    Look up many words in one request
+
+    Useful for annotating a whole page, e.g. with the base_form values
+    returned by /analyze. Words that are not found map to null.
+
+    - **words**: Japanese words (kanji or kana)
+    - **deinflect**: Resolve conjugated words to their dictionary form (default: true)
+    """
+    if len(request.words) > WORD_LOOKUP_MAX_WORDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many words: {len(request.words)} (max {WORD_LOOKUP_MAX_WORDS})"
+        )
+
+    if request.deinflect:
+        results = DictionaryService.lookup_inflected(db, request.words)
+    else:
+        results = DictionaryService.lookup_words(db, request.words)
+    return WordLookupResponse(results=results)
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_dictionary(
+    q: str = Query(..., min_length=1),
+    mode: Literal["form", "gloss"] = "form",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Search the dictionary
+
+    - **q**: Search query
+    - **mode**: form (prefix of kanji/kana spelling or reading, romaji accepted)
+      or gloss (English definition full-text search)
+    - **limit**: Page size (max 100)
+    - **offset**: Number of results to skip
+    """
+    if mode == "gloss":
+        results, has_more = SearchService.search_glosses(db, q, limit, offset)
+    else:
+        results, has_more = SearchService.search_forms(db, q, limit, offset)
+
+    return SearchResponse(
+        query=q,
+        mode=mode,
+        results=results,
+        limit=limit,
+        offset=offset,
+        has_more=has_more
+    )
+
+
 @router.get("/kanji/{character}", response_model=KanjiResponse)
 async def get_kanji_info(character: str, db: Session = Depends(get_db)):
     """
@@ -61,13 +335,88 @@ async def translate_text(request: TranslateRequest):
     """
     Translate Japanese text to English
 
+    - **text**: Japanese text to translate
+    - **source**: Source language (default: ja)
+    - **target**: Target language (default: en)
+    - **method**: Translation method (none, deepl, llamacpp) - optional, uses config default if not specified
+
+    Successful translations are cached, and identical concurrent requests
+    share a single upstream call.
+    """
+    return await translate_cached(request.text, request.source, request.target, request.method)
+
+
+@router.post("/translate/stream")
+async def translate_text_stream(request: TranslateRequest):
+    """
+    Translate text and stream the translation as server-sent events
+
+    Emits "delta" events ({"text": ...}) as the translation is generated,
+    then one "done" event with the full TranslateResponse; on failure the
+    done event carries the error method (e.g. llamacpp_error). Sentences
+    are streamed in order. When the client disconnects, generation on the
+    translation server is aborted.
+
     - **text**: Japanese text to translate
     - **source**: Source language (default: ja)
     - **target**: Target language (default: en)
     - **method**: Translation method (none, deepl, llamacpp) - optional, uses config default if not specified
     """
-    translator = get_translator(method=request.method)
-    return translator.translate(request.text, request.source, request.target)
+    async def generate() -> AsyncIterator[str]:
+        async for event in translate_stream_cached(request.text, request.source, request.target, request.method):
+            name = "delta" if isinstance(event, TranslateDelta) else "done"
+            yield f"event: {name}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/jobs/translate", response_model=TranslationJobResponse, status_code=202)
+async def create_translation_job(request: TranslationJobRequest, db: Session = Depends(get_db)):
+    """
+    Translate a long text (e.g. a book) in the background
+
+    The text is cut into chunks of whole sentences that are translated by
+    a bounded pool of workers. Progress is kept in the database, so jobs
+    resume after a restart without translating finished chunks again.
+    Poll GET /jobs/{id} for progress and the result.
+
+    - **text**: Japanese text to translate
+    - **source**: Source language (default: ja)
+    - **target**: Target language (default: en)
+    - **method**: Translation method (deepl, llamacpp) - optional, uses config default if not specified
+    """
+    if len(request.text) > TRANSLATION_JOB_MAX_CHARS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Text is longer than {TRANSLATION_JOB_MAX_CHARS} characters"
+        )
+    method = get_translator(method=request.method).method
+    if method == "none":
+        raise HTTPException(status_code=400, detail="No translation method is configured")
+
+    job = await run_in_threadpool(
+        TranslationJobService.create_job, db, request.text, method, request.source, request.target
+    )
+    job_runner.notify()
+    return TranslationJobService.get_job(db, job.id)
+
+
+@router.get("/jobs/{job_id}", response_model=TranslationJobResponse)
+async def get_translation_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Get a translation job's progress, and its translation once completed
+
+    - **job_id**: Id returned by POST /jobs/translate
+    """
+    job = TranslationJobService.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -82,9 +431,23 @@ async def health_check(db: Session = Depends(get_db)):
         word_count = 0
         kanji_count = 0
 
+    analysis_cache = get_analysis_cache().stats()
+
     return HealthResponse(
         status="ok",
         database=db_status,
         word_count=word_count,
-        kanji_count=kanji_count
+        kanji_count=kanji_count,
+        caches={
+            **get_cache_stats(),
+            "analysis": analysis_cache["memory"],
+            "documents": document_store.stats(),
+            "translation": get_translation_cache().stats()
+        },
+        analysis_disk_cache=DiskCacheStats(**analysis_cache["disk"]) if analysis_cache["disk"] else None,
+        kanji_index=index.stats() if (index := get_kanji_index()) else None,
+        analyzer_pool=AnalyzerPoolStats(**get_tagger_pool().stats()),
+        translation_backends={
+            method: TranslationBackendStats(**stats) for method, stats in get_translator_stats().items()
+        }
     )
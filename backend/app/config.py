@@ -14,6 +14,63 @@ DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 # Translation settings
 TRANSLATION_METHOD = os.getenv("TRANSLATION_METHOD", "none")  # none|deepl|local
 DEEPL_API_KEY = os.getenv("DEEPL_API_KEY", "")
+# GGUF model served by llama.cpp; part of the translation cache key
+MODEL_FILE = os.getenv("MODEL_FILE", "LFM2-350M-ENJP-MT-Q4_K_M.gguf")
+# llama.cpp server: concurrent requests are limited to its parallel slots
+# (llama-server --parallel), each request translating one sentence
+LLAMACPP_URL = os.getenv("LLAMACPP_URL", "http://llamacpp:8080")
+# Comma-separated llama.cpp replicas; requests go to the least busy one
+LLAMACPP_URLS = [url.strip() for url in os.getenv("LLAMACPP_URLS", LLAMACPP_URL).split(",") if url.strip()]
+LLAMACPP_PARALLEL = int(os.getenv("LLAMACPP_PARALLEL", "4"))  # slots per server
+LLAMACPP_HEALTH_INTERVAL = float(os.getenv("LLAMACPP_HEALTH_INTERVAL", "5"))  # seconds between /health checks
+LLAMACPP_TIMEOUT = float(os.getenv("LLAMACPP_TIMEOUT", "30"))  # seconds per sentence
+DEEPL_MAX_CONCURRENCY = int(os.getenv("DEEPL_MAX_CONCURRENCY", "8"))  # requests in flight
+DEEPL_TIMEOUT = float(os.getenv("DEEPL_TIMEOUT", "10"))
+# Circuit breaker: after this many consecutive backend failures, requests
+# fail immediately for TRANSLATION_BREAKER_RESET seconds before a retry
+TRANSLATION_BREAKER_FAILURES = int(os.getenv("TRANSLATION_BREAKER_FAILURES", "5"))
+TRANSLATION_BREAKER_RESET = float(os.getenv("TRANSLATION_BREAKER_RESET", "30"))
+# Translation cache stored next to the database (0 entries disables it)
+TRANSLATION_CACHE_PATH = os.getenv(
+    "TRANSLATION_CACHE_PATH", str(Path(DATABASE_PATH).parent / "translation_cache.db")
+)
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "100000"))
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", "2592000"))  # seconds, 0 = no expiry
+# Background translation jobs (/api/jobs): texts are cut into chunks of
+# whole sentences, translated by a fixed number of workers
+TRANSLATION_JOB_WORKERS = int(os.getenv("TRANSLATION_JOB_WORKERS", "2"))  # chunks translated at once
+TRANSLATION_JOB_CHUNK_CHARS = int(os.getenv("TRANSLATION_JOB_CHUNK_CHARS", "1000"))
+TRANSLATION_JOB_MAX_CHARS = int(os.getenv("TRANSLATION_JOB_MAX_CHARS", "5000000"))
+TRANSLATION_JOB_MAX_ATTEMPTS = int(os.getenv("TRANSLATION_JOB_MAX_ATTEMPTS", "5"))
+
+# Text analysis settings
+# "thread" (taggers in worker threads) or "process" (worker processes, one per core)
+ANALYZER_BACKEND = os.getenv("ANALYZER_BACKEND", "thread")
+ANALYZER_WORKERS = int(os.getenv("ANALYZER_WORKERS", "4"))  # pool threads or processes
+ANALYZER_MAX_QUEUE = int(os.getenv("ANALYZER_MAX_QUEUE", "64"))  # waiting tasks before 503
+ANALYZE_BATCH_MAX_TEXTS = int(os.getenv("ANALYZE_BATCH_MAX_TEXTS", "1000"))
+MAX_SENTENCE_LENGTH = int(os.getenv("MAX_SENTENCE_LENGTH", "2000"))
+# Documents kept for incremental re-analysis (/api/documents)
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "1000"))
+DOCUMENT_CACHE_TTL = float(os.getenv("DOCUMENT_CACHE_TTL", "3600"))  # seconds, 0 = no expiry
+# Analysis result cache: entries kept in memory, and an optional on-disk
+# tier (size limit in MB, 0 disables) stored next to the database
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))
+ANALYSIS_CACHE_DISK_MB = int(os.getenv("ANALYSIS_CACHE_DISK_MB", "0"))
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", str(Path(DATABASE_PATH).parent / "analysis_cache.db"))
+
+# Dictionary lookup settings
+WORD_LOOKUP_MAX_WORDS = int(os.getenv("WORD_LOOKUP_MAX_WORDS", "2000"))
+LOOKUP_CACHE_SIZE = int(os.getenv("LOOKUP_CACHE_SIZE", "4096"))  # entries per cache, 0 disables
+LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", "3600"))  # seconds, 0 = no expiry
+LOOKUP_CACHE_VERSION_CHECK_INTERVAL = float(os.getenv("LOOKUP_CACHE_VERSION_CHECK_INTERVAL", "5"))
+# Load all of KANJIDIC into memory at startup so kanji lookups never hit the database
+KANJI_INDEX_PRELOAD = os.getenv("KANJI_INDEX_PRELOAD", "false").lower() in ("1", "true", "yes")
+
+# Word lookup backend: "sqlite" (ORM queries) or "mmap" (compiled binary file,
+# built with scripts/compile_dictionary.py)
+DICTIONARY_BACKEND = os.getenv("DICTIONARY_BACKEND", "sqlite")
+DICTIONARY_BIN_PATH = os.getenv("DICTIONARY_BIN_PATH", str(DB_DIR / "jmdict.bin"))
 
 # Dictionary file paths
 JMDICT_PATH = DICT_DIR / "JMdict_e.gz"
@@ -1,5 +1,5 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import bindparam, create_engine, inspect, select, text, update
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.config import DATABASE_URL
 
 # Create engine
@@ -28,3 +28,151 @@ def get_db():
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    create_search_index()
+
+
+def add_missing_columns():
+    """Add nullable columns introduced after a database was created"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                    ))
+    backfill_content_hashes()
+
+
+# What each entry's content hash covers, as built by the importers:
+# table -> (record key, hashed columns, [(record key, child table, foreign key, columns)])
+CONTENT_HASH_LAYOUT = {
+    "words": ("word", ["word_id", "word", "reading", "is_common", "jlpt_level", "frequency"], [
+        ("meanings", "word_meanings", "word_id", ["pos", "gloss", "sense_order"]),
+        ("forms", "word_forms", "word_id", ["form", "form_type", "priority"]),
+    ]),
+    "kanji": ("kanji", ["character", "radical", "stroke_count", "grade", "jlpt_level", "frequency"], [
+        ("readings", "kanji_readings", "kanji_id", ["reading_type", "reading"]),
+        ("meanings", "kanji_meanings", "kanji_id", ["meaning", "meaning_order"]),
+    ]),
+}
+
+
+def backfill_content_hashes(batch_size: int = 5000):
+    """
+    Compute content hashes for entries imported before they were stored
+
+    Without them the first dictionary refresh would rewrite every entry.
+    Hashes are rebuilt from the stored rows exactly as the importers compute
+    them from the dictionary files.
+    """
+    from app.utils.hashing import content_hash
+
+    for table_name, (record_key, columns, children) in CONTENT_HASH_LAYOUT.items():
+        parent = Base.metadata.tables.get(table_name)
+        if parent is None:
+            continue
+        with engine.begin() as connection:
+            while True:
+                rows = connection.execute(
+                    select(parent.c.id, *[parent.c[name] for name in columns])
+                    .where(parent.c.content_hash.is_(None))
+                    .order_by(parent.c.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+
+                ids = [row.id for row in rows]
+                records = {
+                    row.id: {record_key: {name: row._mapping[name] for name in columns}}
+                    for row in rows
+                }
+                for child_key, child_name, foreign_key, child_columns in children:
+                    child = Base.metadata.tables[child_name]
+                    for record in records.values():
+                        record[child_key] = []
+                    for child_row in connection.execute(
+                        select(child.c[foreign_key], *[child.c[name] for name in child_columns])
+                        .where(child.c[foreign_key].between(ids[0], ids[-1]))
+                        .order_by(child.c.id)
+                    ):
+                        # The range may include entries that already have a hash
+                        record = records.get(child_row[0])
+                        if record is not None:
+                            record[child_key].append({name: child_row._mapping[name] for name in child_columns})
+
+                connection.execute(
+                    update(parent).where(parent.c.id == bindparam("_id")).values(content_hash=bindparam("_hash")),
+                    [{"_id": parent_id, "_hash": content_hash(record)} for parent_id, record in records.items()]
+                )
+
+
+# Search index rowids are (best form priority << 32) | words.id, so rowid
+# order is commonness order and FTS5 can page through matches without
+# scoring every one of them
+SEARCH_ROWID_SHIFT = 32
+
+
+# Gloss indexes: stemmed, so "running" matches "run", and unstemmed, so
+# a half-typed word ("runn") still matches as a prefix
+SEARCH_INDEX_TABLES = {
+    "word_glosses_fts": "tokenize='porter unicode61'",
+    "word_glosses_prefix_fts": "tokenize='unicode61', prefix='2 3'",
+}
+
+
+def create_search_index():
+    """Create the full-text indexes over English glosses (one document per word)"""
+    with engine.begin() as connection:
+        existing = set(connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )).scalars())
+        for table, options in SEARCH_INDEX_TABLES.items():
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+                f"glosses, content='', {options})"
+            ))
+            # An index added after the words were imported starts out empty
+            if table not in existing and "word_meanings" in existing:
+                _fill_search_index(connection, table)
+
+
+def rebuild_search_index():
+    """Rebuild the gloss full-text indexes after words or meanings changed"""
+    create_search_index()
+    with engine.begin() as connection:
+        for table in SEARCH_INDEX_TABLES:
+            connection.execute(text(f"INSERT INTO {table}({table}) VALUES('delete-all')"))
+            _fill_search_index(connection, table)
+
+
+def _fill_search_index(connection, table: str):
+    connection.execute(text(f"""
+        INSERT INTO {table}(rowid, glosses)
+        SELECT (COALESCE(best.priority, 255) << {SEARCH_ROWID_SHIFT}) | glosses.word_id,
+               glosses.text
+        FROM (
+            SELECT word_id, group_concat(gloss, ' ; ') AS text
+            FROM word_meanings GROUP BY word_id
+        ) AS glosses
+        LEFT JOIN (
+            SELECT word_id, MIN(priority) AS priority
+            FROM word_forms GROUP BY word_id
+        ) AS best ON best.word_id = glosses.word_id
+    """))
+
+
+def get_data_version(db: Session) -> int:
+    """Get the dictionary data version (bumped by every import)"""
+    return db.execute(text("PRAGMA user_version")).scalar()
+
+
+def bump_data_version():
+    """Mark dictionary data as changed so running servers drop cached lookups"""
+    with engine.begin() as connection:
+        version = connection.execute(text("PRAGMA user_version")).scalar()
+        connection.execute(text(f"PRAGMA user_version = {version + 1}"))
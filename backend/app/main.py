@@ -1,12 +1,44 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api import routes
-from app.config import API_TITLE, API_VERSION, API_DESCRIPTION, ALLOWED_ORIGINS
+from app.config import (
+    API_TITLE, API_VERSION, API_DESCRIPTION, ALLOWED_ORIGINS, KANJI_INDEX_PRELOAD
+)
+from app.database import SessionLocal
+from app.services.analyzer import AnalyzerBusyError, shutdown_tagger_pool
+from app.services.jobs import job_runner
+from app.services.kanji_index import load_kanji_index
+from app.services.translator import close_translators
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load in-memory indexes and resume translation jobs on startup; stop workers on shutdown"""
+    if KANJI_INDEX_PRELOAD:
+        db = SessionLocal()
+        try:
+            index = load_kanji_index(db)
+        finally:
+            db.close()
+        logger.info("Loaded kanji index: %d entries, %.1f MB",
+                    len(index), index.memory_footprint() / 1024 / 1024)
+    await job_runner.start()
+    yield
+    await job_runner.stop()
+    shutdown_tagger_pool()
+    await close_translators()
+
 
 app = FastAPI(
     title=API_TITLE,
     version=API_VERSION,
-    description=API_DESCRIPTION
+    description=API_DESCRIPTION,
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend access
@@ -18,6 +50,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(AnalyzerBusyError)
+async def analyzer_busy_handler(request: Request, exc: AnalyzerBusyError):
+    """Tell clients to back off when the tagger pool is saturated"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 # Include API routes
 app.include_router(routes.router, prefix="/api")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -14,9 +14,27 @@ class Word(Base):
     is_common = Column(Boolean, default=False, index=True)
     jlpt_level = Column(Integer, nullable=True)
     frequency = Column(Integer, nullable=True)
+    content_hash = Column(String(40), nullable=True)  # Detects changed entries on refresh
     created_at = Column(DateTime, server_default=func.now())
 
     meanings = relationship("WordMeaning", back_populates="word", cascade="all, delete-orphan")
+    forms = relationship("WordForm", back_populates="word", cascade="all, delete-orphan")
+
+
+class WordForm(Base):
+    __tablename__ = "word_forms"
+    __table_args__ = (
+        # Resolves a form and ranks candidates in one index scan
+        Index("ix_word_forms_form_priority", "form", "priority"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    word_id = Column(Integer, ForeignKey("words.id", ondelete="CASCADE"), nullable=False, index=True)
+    form = Column(String, nullable=False)
+    form_type = Column(String, nullable=False)  # kanji, reading
+    priority = Column(Integer, nullable=False)  # Lower ranks first (commonness, then kanji before kana)
+
+    word = relationship("Word", back_populates="forms")
 
 
 class WordMeaning(Base):
@@ -41,6 +59,7 @@ class Kanji(Base):
     grade = Column(Integer, nullable=True)
     jlpt_level = Column(Integer, nullable=True)
     frequency = Column(Integer, nullable=True)
+    content_hash = Column(String(40), nullable=True)  # Detects changed entries on refresh
     created_at = Column(DateTime, server_default=func.now())
 
     readings = relationship("KanjiReading", back_populates="kanji", cascade="all, delete-orphan")
@@ -67,3 +86,38 @@ class KanjiMeaning(Base):
     meaning_order = Column(Integer, default=1)
 
     kanji = relationship("Kanji", back_populates="meanings")
+
+
+class TranslationJob(Base):
+    __tablename__ = "translation_jobs"
+
+    id = Column(String(32), primary_key=True)  # Random hex id
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    method = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    target = Column(String, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    chunks = relationship("TranslationChunk", back_populates="job", cascade="all, delete-orphan")
+
+
+class TranslationChunk(Base):
+    __tablename__ = "translation_chunks"
+    __table_args__ = (
+        # Workers claim the oldest pending chunk
+        Index("ix_translation_chunks_status_id", "status", "id"),
+        Index("ix_translation_chunks_job_position", "job_id", "position"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String(32), ForeignKey("translation_jobs.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)
+    text = Column(String, nullable=False)
+    translation = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    retry_at = Column(Float, nullable=True)  # Unix time before which a failed chunk is not retried
+    error = Column(String, nullable=True)
+
+    job = relationship("TranslationJob", back_populates="chunks")
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
 
 
 # Request/Response schemas for API
@@ -22,6 +23,61 @@ class AnalyzeResponse(BaseModel):
     tokens: List[Token]
 
 
+class AnalyzeStreamRequest(BaseModel):
+    text: str
+    unit: Literal["token", "sentence"] = "token"
+
+
+class SentenceTokens(BaseModel):
+    start: int
+    end: int
+    tokens: List[Token]
+
+
+class DocumentRequest(BaseModel):
+    text: str
+
+
+class DocumentEdit(BaseModel):
+    start: int  # Replace text[start:end] with text
+    end: int
+    text: str = ""
+
+
+class DocumentEditRequest(BaseModel):
+    version: int  # Version the edits are based on
+    edits: List[DocumentEdit]
+
+
+class DocumentResponse(BaseModel):
+    id: str
+    version: int
+    length: int
+    tokens: List[Token]
+
+
+class TokenSplice(BaseModel):
+    index: int  # Position in the token list before this splice
+    delete: int  # Number of tokens removed at index
+    tokens: List[Token]  # Tokens inserted at index (document offsets)
+    shift: int  # Added to start/end of every token after the inserted ones
+
+
+class DocumentDiffResponse(BaseModel):
+    id: str
+    version: int
+    length: int
+    changes: List[TokenSplice]
+
+
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str]
+
+
+class BatchAnalyzeResponse(BaseModel):
+    results: List[AnalyzeResponse]
+
+
 class WordMeaningDetail(BaseModel):
     pos: str
     definitions: List[str]
@@ -34,6 +90,16 @@ class WordResponse(BaseModel):
     is_common: bool
     jlpt_level: Optional[int] = None
     frequency: Optional[int] = None
+    inflection: Optional[List[str]] = None  # Conjugations from the dictionary form, e.g. ["polite", "past"]
+
+
+class WordLookupRequest(BaseModel):
+    words: List[str]
+    deinflect: bool = True  # Resolve conjugated words to their dictionary form
+
+
+class WordLookupResponse(BaseModel):
+    results: Dict[str, Optional[WordResponse]]
 
 
 class KanjiReadings(BaseModel):
@@ -53,6 +119,29 @@ class KanjiResponse(BaseModel):
     frequency: Optional[int] = None
 
 
+class EnrichedAnalyzeResponse(BaseModel):
+    tokens: List[Token]
+    words: Dict[str, WordResponse]  # keyed by token base_form
+    kanji: Dict[str, KanjiResponse]  # keyed by character
+
+
+class SearchResult(BaseModel):
+    word: str
+    reading: str
+    matched_form: Optional[str] = None  # Form that matched a prefix search
+    is_common: bool
+    glosses: List[str]
+
+
+class SearchResponse(BaseModel):
+    query: str
+    mode: Literal["form", "gloss"]
+    results: List[SearchResult]
+    limit: int
+    offset: int
+    has_more: bool
+
+
 class TranslateRequest(BaseModel):
     text: str
     source: str = "ja"
@@ -66,8 +155,94 @@ class TranslateResponse(BaseModel):
     method: str  # none|deepl|local
 
 
+class TranslateDelta(BaseModel):
+    text: str  # Next chunk of the translation
+
+
+class TranslationJobRequest(BaseModel):
+    text: str
+    source: str = "ja"
+    target: str = "en"
+    method: Optional[str] = None  # deepl, llamacpp (if None, uses config default)
+
+
+class TranslationJobResponse(BaseModel):
+    id: str
+    status: Literal["queued", "running", "completed", "failed"]
+    method: str
+    source: str
+    target: str
+    chunks: int
+    completed_chunks: int
+    failed_chunks: int
+    progress: float  # Fraction of chunks finished (translated or failed)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    translation: Optional[str] = None  # Set once completed
+    error: Optional[str] = None  # First chunk error of a failed job
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+
+class DiskCacheStats(BaseModel):
+    size: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+
+class KanjiIndexStats(BaseModel):
+    entries: int
+    memory_bytes: int
+    load_seconds: float
+
+
+class AnalyzerPoolStats(BaseModel):
+    size: int
+    max_queue: int
+    active: int
+    queued: int
+    completed: int
+    rejected: int
+    utilization: float
+
+
+class TranslationNodeStats(BaseModel):
+    url: str
+    healthy: bool
+    state: Literal["closed", "open", "half_open"]
+    in_flight: int
+    requests: int
+    errors: int
+    latency_ms: Optional[float] = None  # Smoothed over recent successful requests
+
+
+class TranslationBackendStats(BaseModel):
+    state: Literal["closed", "open", "half_open"]
+    failures: int
+    rejected: int
+    in_flight: int
+    max_concurrency: int
+    nodes: List[TranslationNodeStats] = []  # llama.cpp servers
+
+
 class HealthResponse(BaseModel):
     status: str
     database: str
     word_count: int
     kanji_count: int
+    caches: Dict[str, CacheStats] = {}
+    analysis_disk_cache: Optional[DiskCacheStats] = None
+    kanji_index: Optional[KanjiIndexStats] = None
+    analyzer_pool: Optional[AnalyzerPoolStats] = None
+    translation_backends: Dict[str, TranslationBackendStats] = {}
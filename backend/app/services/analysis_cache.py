@@ -0,0 +1,264 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+import fugashi
+from app.config import ANALYSIS_CACHE_DISK_MB, ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_SIZE
+from app.services.cache import MISSING, LRUCache
+from app.utils.iterables import chunked
+
+# Bump when the serialized analysis output changes shape
+ANALYSIS_FORMAT_VERSION = 1
+
+# Fraction of the disk limit kept after an eviction pass, so eviction
+# does not run again on the very next insert
+DISK_EVICTION_TARGET = 0.9
+
+# Maximum number of keys per IN (...) query
+DISK_LOOKUP_CHUNK_SIZE = 500
+
+
+def tagger_version() -> str:
+    """
+    Identify the tokenizer output: fugashi, MeCab dictionary and output format
+
+    The dictionary files' size and modification time are included, so
+    replacing or upgrading the dictionary changes the version even if its
+    header version number does not.
+    """
+    parts = [str(ANALYSIS_FORMAT_VERSION), getattr(fugashi, "__version__", "")]
+    for info in fugashi.Tagger().dictionary_info:
+        parts.append(f"{info['filename']}:{info['version']}:{info['size']}")
+        try:
+            stat = os.stat(info["filename"])
+            parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            pass
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    SQLite-backed byte store with least-recently-used eviction by total size
+
+    Bodies are zlib-compressed. Entries written under another tagger
+    version are dropped when the cache is opened.
+    """
+
+    def __init__(self, path: str, max_bytes: int, version: str):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_cache_accessed ON analysis_cache (accessed)"
+        )
+        self._connection.execute("DELETE FROM analysis_cache WHERE version != ?", (version,))
+        self._total = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM analysis_cache"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Get several bodies with one query per chunk of keys; absent keys are left out"""
+        found = {}
+        with self._lock:
+            for chunk in chunked(list(dict.fromkeys(keys)), DISK_LOOKUP_CHUNK_SIZE):
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, body FROM analysis_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                if rows:
+                    self._connection.execute(
+                        f"UPDATE analysis_cache SET accessed = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [time.time(), *(key for key, _ in rows)]
+                    )
+                found.update(rows)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return {key: zlib.decompress(body) for key, body in found.items()}
+
+    def set(self, key: str, body: bytes) -> None:
+        self.set_many({key: body})
+
+    def set_many(self, bodies: Dict[str, bytes]) -> None:
+        """Store several bodies in one transaction"""
+        compressed = {
+            key: data for key, data in ((key, zlib.compress(body, 1)) for key, body in bodies.items())
+            if len(data) <= self.max_bytes
+        }
+        if not compressed:
+            return
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                for key, data in compressed.items():
+                    previous = self._connection.execute(
+                        "SELECT size FROM analysis_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO analysis_cache (key, version, body, size, accessed) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, self.version, data, len(data), time.time())
+                    )
+                    self._total += len(data) - (previous[0] if previous else 0)
+                if self._total > self.max_bytes:
+                    self._evict()
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                self._total = self._connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM analysis_cache"
+                ).fetchone()[0]
+                raise
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the target size"""
+        target = self.max_bytes * DISK_EVICTION_TARGET
+        removed = []
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM analysis_cache ORDER BY accessed"
+        ):
+            if self._total <= target:
+                break
+            removed.append((key,))
+            self._total -= size
+        self._connection.executemany("DELETE FROM analysis_cache WHERE key = ?", removed)
+        self.evictions += len(removed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._connection.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0],
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+class AnalysisCache:
+    """
+    Serialized analysis results keyed by a hash of (tagger version, kind, text)
+
+    Lookups try the in-memory LRU first, then the optional disk tier;
+    disk hits are promoted to memory. Because the tagger version is part
+    of every key, results from a previous MeCab dictionary are never served.
+    """
+
+    def __init__(self, memory_size: int, disk_path: Optional[str], disk_max_bytes: int):
+        self.version = tagger_version()
+        self.memory = LRUCache(memory_size)
+        self.disk = DiskCache(disk_path, disk_max_bytes, self.version) \
+            if disk_path and disk_max_bytes > 0 else None
+
+    def key(self, kind: str, text: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{self.version}\0{kind}\0".encode("utf-8"))
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, kind: str, text: str) -> Optional[bytes]:
+        """
+        Get a cached response body
+
+        Args:
+            kind: Output format (e.g. "tokens", "columnar")
+            text: Analyzed text
+
+        Returns:
+            The serialized result, or None if not cached
+        """
+        key = self.key(kind, text)
+        body = self.memory.get(key)
+        if body is not MISSING:
+            return body
+        if self.disk is not None:
+            body = self.disk.get(key)
+            if body is not None:
+                self.memory.set(key, body)
+                return body
+        return None
+
+    def get_many(self, kind: str, texts: List[str]) -> List[Optional[bytes]]:
+        """
+        Get cached response bodies for many texts
+
+        Memory misses are looked up on disk in one batch rather than one
+        query per text.
+
+        Args:
+            kind: Output format (e.g. "tokens", "columnar")
+            texts: Analyzed texts
+
+        Returns:
+            The serialized result per text, or None where not cached
+        """
+        keys = [self.key(kind, text) for text in texts]
+        bodies = [self.memory.get(key) for key in keys]
+        missing = [key for key, body in zip(keys, bodies) if body is MISSING]
+        found = self.disk.get_many(missing) if self.disk is not None and missing else {}
+        for key, body in found.items():
+            self.memory.set(key, body)
+        return [found.get(key) if body is MISSING else body for key, body in zip(keys, bodies)]
+
+    def set(self, kind: str, text: str, body: bytes) -> None:
+        """Store a serialized result in every tier"""
+        key = self.key(kind, text)
+        self.memory.set(key, body)
+        if self.disk is not None:
+            self.disk.set(key, body)
+
+    def set_many(self, kind: str, bodies: Dict[str, bytes]) -> None:
+        """Store serialized results for many texts (text -> body) in every tier"""
+        keyed = {self.key(kind, text): body for text, body in bodies.items()}
+        for key, body in keyed.items():
+            self.memory.set(key, body)
+        if self.disk is not None:
+            self.disk.set_many(keyed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None
+        }
+
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get or create the analysis result cache"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                _analysis_cache = AnalysisCache(
+                    ANALYSIS_CACHE_SIZE, ANALYSIS_CACHE_PATH, ANALYSIS_CACHE_DISK_MB * 1024 * 1024
+                )
+    return _analysis_cache
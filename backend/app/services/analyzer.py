@@ -1,21 +1,56 @@
+import asyncio
+import threading
 import fugashi
-from typing import List
+from array import array
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.config import ANALYZER_BACKEND, ANALYZER_MAX_QUEUE, ANALYZER_WORKERS, MAX_SENTENCE_LENGTH
 from app.schemas import Token
+from app.utils.kana import katakana_to_hiragana
 
 
-def katakana_to_hiragana(text: str) -> str:
-    """Convert katakana to hiragana"""
-    result = []
-    for char in text:
-        code = ord(char)
-        # Katakana range: 0x30A1 to 0x30F6
-        # Hiragana range: 0x3041 to 0x3096
-        # Offset: -96 (0x60)
-        if 0x30A1 <= code <= 0x30F6:
-            result.append(chr(code - 0x60))
-        else:
-            result.append(char)
-    return ''.join(result)
+# Characters that end a sentence, and closing brackets that may follow them
+SENTENCE_TERMINATORS = frozenset("。！？!?．\n")
+CLOSING_BRACKETS = frozenset("」』）)】〉》\"'")
+
+
+def split_sentences(text: str, max_length: int = MAX_SENTENCE_LENGTH,
+                    start: int = 0) -> Iterator[Tuple[int, str]]:
+    """
+    Split text at sentence boundaries
+
+    Pieces longer than max_length are cut so that a document without
+    punctuation still yields bounded chunks. Concatenating the pieces
+    reproduces the original text exactly. Pieces only depend on the text
+    from their start onwards, so splitting from any piece's start yields
+    the same pieces from there on.
+
+    Args:
+        text: Text to split
+        max_length: Maximum length of a single piece
+        start: Offset to start splitting at
+
+    Yields:
+        (start offset, sentence) for each piece
+    """
+    length = len(text)
+    i = start
+
+    while i < length:
+        char = text[i]
+        i += 1
+        if char in SENTENCE_TERMINATORS:
+            # Keep trailing terminators and closing brackets with the sentence
+            while i < length and (text[i] in SENTENCE_TERMINATORS or text[i] in CLOSING_BRACKETS):
+                i += 1
+            yield start, text[start:i]
+            start = i
+        elif i - start >= max_length:
+            yield start, text[start:i]
+            start = i
+
+    if start < length:
+        yield start, text[start:]
 
 
 class TextAnalyzer:
@@ -27,6 +62,14 @@ class TextAnalyzer:
         except Exception as e:
             raise RuntimeError(f"Failed to initialize MeCab tagger: {e}")
 
+        # Positions of the fields we read in the dictionary's raw feature
+        # CSV; splitting it is much cheaper than building word.feature
+        fields = type(self.tagger("日本")[0].feature)._fields
+        self._pos_index = fields.index("pos1")
+        self._pos_detail_index = fields.index("pos2")
+        self._lemma_index = fields.index("lemma")
+        self._kana_index = fields.index("kana")
+
     def analyze(self, text: str) -> List[Token]:
         """
         Analyze Japanese text and return tokens with readings and POS
@@ -37,54 +80,363 @@ class TextAnalyzer:
         Returns:
             List of Token objects with surface form, reading, base form, and POS
         """
-        if not text or not text.strip():
-            return []
+        return list(self.iter_tokens(text))
 
-        tokens = []
-        position = 0
+    def iter_tokens(self, text: str, offset: int = 0) -> Iterator[Token]:
+        """
+        Tokenize text, yielding tokens one at a time
 
-        for word in self.tagger(text):
-            # Extract reading (furigana)
-            # fugashi provides kana reading in feature.kana (katakana)
-            # Convert to hiragana for furigana display
-            reading = word.feature.kana if hasattr(word.feature, 'kana') and word.feature.kana else word.surface
-            reading = katakana_to_hiragana(reading)
-
-            # Extract base form (lemma)
-            base_form = word.feature.lemma if hasattr(word.feature, 'lemma') and word.feature.lemma else word.surface
-
-            # Extract part of speech
-            pos = word.feature.pos1 if hasattr(word.feature, 'pos1') else "unknown"
-            pos_detail = word.feature.pos2 if hasattr(word.feature, 'pos2') else None
-
-            # Calculate character positions by finding surface in text
-            start = text.find(word.surface, position)
-            if start == -1:
-                # If not found, use current position (shouldn't happen)
-                start = position
-            end = start + len(word.surface)
-            position = end
-
-            tokens.append(Token(
-                surface=word.surface,
+        Args:
+            text: Japanese text to analyze
+            offset: Character offset of text within a larger document,
+                    added to every token's start/end
+
+        Yields:
+            Token objects with surface form, reading, base form, and POS
+        """
+        for surface, reading, base_form, pos, pos_detail, start, end in self._morphemes(text, offset):
+            yield Token(
+                surface=surface,
                 reading=reading,
                 base_form=base_form,
                 pos=pos,
                 pos_detail=pos_detail,
                 start=start,
                 end=end
-            ))
+            )
 
-        return tokens
+    def analyze_columnar(self, text: str, offset: int = 0) -> "ColumnarTokens":
+        """
+        Tokenize text into parallel arrays instead of Token objects
 
+        Much cheaper than analyze() for large inputs: strings are interned
+        into one table and no model is validated per token.
+
+        Args:
+            text: Japanese text to analyze
+            offset: Character offset of text within a larger document
 
-# Singleton instance
-_analyzer_instance = None
+        Returns:
+            ColumnarTokens holding the same data analyze() would return
+        """
+        result = ColumnarTokens()
+        # Insertion-ordered, so the keys become the string table
+        ids: Dict[str, int] = {}
+        intern = ids.setdefault
+
+        for surface, reading, base_form, pos, pos_detail, start, end in self._morphemes(text, offset):
+            result.start.append(start)
+            result.end.append(end)
+            result.surface.append(intern(surface, len(ids)))
+            result.reading.append(intern(reading, len(ids)))
+            result.base_form.append(intern(base_form, len(ids)))
+            result.pos.append(intern(pos, len(ids)))
+            result.pos_detail.append(-1 if pos_detail is None else intern(pos_detail, len(ids)))
+
+        result.strings = list(ids)
+        return result
+
+    def _morphemes(self, text: str, offset: int) -> Iterator[Tuple[str, str, str, str, Optional[str], int, int]]:
+        """Yield (surface, reading, base_form, pos, pos_detail, start, end) per morpheme"""
+        if not text or not text.strip():
+            return
+
+        position = offset
+        pos_index = self._pos_index
+        pos_detail_index = self._pos_detail_index
+        lemma_index = self._lemma_index
+        kana_index = self._kana_index
+        last_index = max(lemma_index, kana_index)
+
+        for word in self.tagger(text):
+            surface = word.surface
+            raw = word.feature_raw
+            if '"' in raw:
+                # Quoted field (e.g. a comma in a surface form); let fugashi parse it
+                feature = word.feature
+                pos, pos_detail, lemma, kana = feature.pos1, feature.pos2, feature.lemma, feature.kana
+            else:
+                values = raw.split(",", last_index + 1)
+                pos = values[pos_index]
+                pos_detail = values[pos_detail_index]
+                if len(values) > last_index:
+                    lemma = values[lemma_index]
+                    kana = values[kana_index]
+                else:
+                    # Unknown words only carry the POS fields
+                    lemma = kana = None
+            base_form = lemma or surface
+
+            # Reading (furigana): UniDic gives katakana, displayed as hiragana;
+            # unknown words have none
+            reading = katakana_to_hiragana(kana or surface)
+
+            # Whitespace before a morpheme is not part of its surface, so
+            # offsets follow from lengths without searching the text
+            position += len(word.white_space)
+            start = position
+            position += len(surface)
+
+            yield surface, reading, base_form, pos, pos_detail, start, position
+
+
+class ColumnarTokens:
+    """
+    Tokens as parallel arrays over a table of distinct strings
+
+    Entry i of surface/reading/base_form/pos/pos_detail is an index into
+    strings (pos_detail is -1 when missing); start/end are character offsets.
+    """
+
+    __slots__ = ("strings", "start", "end", "surface", "reading", "base_form", "pos", "pos_detail")
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.start = array("I")
+        self.end = array("I")
+        self.surface = array("I")
+        self.reading = array("I")
+        self.base_form = array("I")
+        self.pos = array("I")
+        self.pos_detail = array("i")
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def to_dict(self) -> Dict[str, list]:
+        """Plain lists, ready for JSON serialization"""
+        return {
+            "strings": self.strings,
+            "start": self.start.tolist(),
+            "end": self.end.tolist(),
+            "surface": self.surface.tolist(),
+            "reading": self.reading.tolist(),
+            "base_form": self.base_form.tolist(),
+            "pos": self.pos.tolist(),
+            "pos_detail": self.pos_detail.tolist()
+        }
+
+
+# Per-thread instances (fugashi.Tagger must not be shared between threads)
+_thread_local = threading.local()
+
+
+def get_thread_analyzer() -> TextAnalyzer:
+    """Get or create the TextAnalyzer owned by the current thread"""
+    analyzer = getattr(_thread_local, "analyzer", None)
+    if analyzer is None:
+        analyzer = TextAnalyzer()
+        _thread_local.analyzer = analyzer
+    return analyzer
 
 
 def get_analyzer() -> TextAnalyzer:
-    """Get or create singleton TextAnalyzer instance"""
-    global _analyzer_instance
-    if _analyzer_instance is None:
-        _analyzer_instance = TextAnalyzer()
-    return _analyzer_instance
+    """Get the TextAnalyzer for the current thread (a tagger is not thread-safe)"""
+    return get_thread_analyzer()
+
+
+class AnalyzerBusyError(RuntimeError):
+    """Raised when the tagger pool has no room for more work"""
+
+
+class TaggerPool:
+    """
+    Workers that each own a tagger (threads; see ProcessTaggerPool for processes)
+
+    At most size + max_queue tasks are accepted at a time; beyond that,
+    work is rejected with AnalyzerBusyError instead of queueing without
+    bound, so callers fail fast (HTTP 503) rather than time out.
+    """
+
+    def __init__(self, size: int, max_queue: int):
+        self.size = size
+        self.max_queue = max_queue
+        self._executor = self._create_executor()
+        self._lock = threading.Lock()
+        self._pending = 0  # Accepted tasks that have not finished
+        self._active = 0   # Tasks running on a worker
+        self._completed = 0
+        self._rejected = 0
+
+    def _create_executor(self) -> Executor:
+        return ThreadPoolExecutor(
+            max_workers=self.size,
+            thread_name_prefix="analyzer",
+            initializer=get_thread_analyzer  # Load each worker's tagger up front
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.size + self.max_queue
+
+    def _admit(self, count: int, reject: bool = True):
+        with self._lock:
+            # A request that needs more than the whole capacity still runs on an idle pool
+            if reject and self._pending and self._pending + count > self.capacity:
+                self._rejected += 1
+                raise AnalyzerBusyError(
+                    f"Analyzer pool is saturated ({self._pending} tasks pending, capacity {self.capacity})"
+                )
+            self._pending += count
+
+    def ensure_capacity(self):
+        """Raise AnalyzerBusyError if a new task would be rejected"""
+        self._admit(1)
+        with self._lock:
+            self._pending -= 1
+
+    def _run(self, fn: Callable, *args):
+        with self._lock:
+            self._active += 1
+        try:
+            return fn(get_thread_analyzer(), *args)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        return self._executor.submit(self._run, fn, *args)
+
+    def _finished(self, future: Future):
+        # Also called for tasks cancelled before they started
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    def _decode(self, result):
+        return result
+
+    async def _dispatch(self, fn: Callable, *args):
+        future = self._submit(fn, *args)
+        future.add_done_callback(self._finished)
+        return self._decode(await asyncio.wrap_future(future))
+
+    async def run(self, fn: Callable, *args, reject: bool = True):
+        """
+        Run fn(analyzer, *args) on a worker
+
+        Args:
+            fn: Module-level function taking the worker's TextAnalyzer as
+                first argument and returning tokens
+            reject: Raise AnalyzerBusyError if the pool is saturated; pass
+                    False for follow-up work of an already admitted request
+
+        Returns:
+            The return value of fn
+        """
+        self._admit(1, reject)
+        return await self._dispatch(fn, *args)
+
+    async def map(self, fn: Callable, items: List) -> List:
+        """
+        Run fn(analyzer, item) for every item, admitting them all or none
+
+        Returns:
+            Results in the same order as items
+        """
+        self._admit(len(items))
+        return await asyncio.gather(*(self._dispatch(fn, item) for item in items))
+
+    def _active_count(self) -> int:
+        return self._active
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            active = self._active_count()
+            return {
+                "size": self.size,
+                "max_queue": self.max_queue,
+                "active": active,
+                "queued": self._pending - active,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "utilization": active / self.size if self.size else 0.0
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+
+
+def get_tagger_pool() -> TaggerPool:
+    """Get or create the shared tagger pool (threads or processes, per ANALYZER_BACKEND)"""
+    global _pool
+    if _pool is None:
+        if ANALYZER_BACKEND == "process":
+            from app.services.analyzer_process import ProcessTaggerPool
+            _pool = ProcessTaggerPool(ANALYZER_WORKERS, ANALYZER_MAX_QUEUE)
+        else:
+            _pool = TaggerPool(ANALYZER_WORKERS, ANALYZER_MAX_QUEUE)
+    return _pool
+
+
+def shutdown_tagger_pool():
+    """Stop the tagger pool's workers (on application shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def _analyze(analyzer: TextAnalyzer, text: str, offset: int = 0) -> List[Token]:
+    return list(analyzer.iter_tokens(text, offset=offset))
+
+
+def _analyze_columnar(analyzer: TextAnalyzer, text: str) -> ColumnarTokens:
+    return analyzer.analyze_columnar(text)
+
+
+def _analyze_many(analyzer: TextAnalyzer, texts: List[str]) -> List[List[Token]]:
+    return [analyzer.analyze(text) for text in texts]
+
+
+async def analyze_async(text: str, offset: int = 0, reject: bool = True) -> List[Token]:
+    """
+    Analyze a single text on the tagger pool without blocking the event loop
+
+    Args:
+        text: Japanese text to analyze
+        offset: Character offset of text within a larger document
+        reject: Fail instead of queueing when the pool is saturated
+
+    Raises:
+        AnalyzerBusyError: If the pool is saturated
+    """
+    return await get_tagger_pool().run(_analyze, text, offset, reject=reject)
+
+
+async def analyze_columnar_async(text: str) -> ColumnarTokens:
+    """
+    Analyze a single text into ColumnarTokens on the tagger pool
+
+    Raises:
+        AnalyzerBusyError: If the pool is saturated
+    """
+    return await get_tagger_pool().run(_analyze_columnar, text)
+
+
+async def analyze_batch(texts: List[str]) -> List[List[Token]]:
+    """
+    Analyze many texts concurrently on the tagger pool
+
+    Texts are split into one contiguous slice per worker, so a batch
+    occupies at most one pool slot per worker.
+
+    Args:
+        texts: Japanese texts to analyze
+
+    Returns:
+        Token lists in the same order as the input texts
+
+    Raises:
+        AnalyzerBusyError: If the pool is saturated
+    """
+    if not texts:
+        return []
+    pool = get_tagger_pool()
+    slices = min(len(texts), pool.size)
+    step = -(-len(texts) // slices)
+    results = await pool.map(_analyze_many, [texts[i:i + step] for i in range(0, len(texts), step)])
+    return [tokens for chunk in results for tokens in chunk]
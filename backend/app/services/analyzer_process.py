@@ -0,0 +1,121 @@
+import multiprocessing as mp
+from array import array
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Callable, Dict, Tuple
+from app.schemas import Token
+from app.services.analyzer import ColumnarTokens, TaggerPool, get_thread_analyzer
+
+# Index stored for a missing pos_detail
+NO_STRING = 0xFFFFFFFF
+
+# Per token: surface, reading, base_form, pos, pos_detail (string table
+# indexes), start, end
+FIELDS_PER_TOKEN = 7
+
+# (nested, tokens per document, packed token fields, string table)
+EncodedTokens = Tuple[bool, bytes, bytes, Tuple[str, ...]]
+
+
+def encode_tokens(result) -> EncodedTokens:
+    """
+    Pack tokens into flat integer arrays and a table of distinct strings
+
+    Only a few bytes objects and one tuple of unique strings cross the
+    process boundary, instead of one pickled object per token.
+
+    Args:
+        result: Token list, or list of token lists (one per document)
+
+    Returns:
+        Encoded form accepted by decode_tokens
+    """
+    nested = bool(result) and isinstance(result[0], list)
+    documents = result if nested else [result]
+
+    strings: Dict[str, int] = {}
+    lengths = array("I")
+    fields = array("I")
+    for tokens in documents:
+        lengths.append(len(tokens))
+        for token in tokens:
+            fields.extend((
+                strings.setdefault(token.surface, len(strings)),
+                strings.setdefault(token.reading, len(strings)),
+                strings.setdefault(token.base_form, len(strings)),
+                strings.setdefault(token.pos, len(strings)),
+                NO_STRING if token.pos_detail is None
+                else strings.setdefault(token.pos_detail, len(strings)),
+                token.start,
+                token.end
+            ))
+
+    return nested, lengths.tobytes(), fields.tobytes(), tuple(strings)
+
+
+def decode_tokens(encoded: EncodedTokens):
+    """Rebuild the token list (or lists) packed by encode_tokens"""
+    nested, length_bytes, field_bytes, strings = encoded
+    lengths = array("I")
+    lengths.frombytes(length_bytes)
+    fields = array("I")
+    fields.frombytes(field_bytes)
+
+    documents = []
+    position = 0
+    for length in lengths:
+        tokens = []
+        for _ in range(length):
+            surface, reading, base_form, pos, pos_detail, start, end = \
+                fields[position:position + FIELDS_PER_TOKEN]
+            position += FIELDS_PER_TOKEN
+            # Values were validated when the worker built them
+            tokens.append(Token.model_construct(
+                surface=strings[surface],
+                reading=strings[reading],
+                base_form=strings[base_form],
+                pos=strings[pos],
+                pos_detail=None if pos_detail == NO_STRING else strings[pos_detail],
+                start=start,
+                end=end
+            ))
+        documents.append(tokens)
+
+    return documents if nested else documents[0]
+
+
+def _run_encoded(fn: Callable, args: tuple):
+    result = fn(get_thread_analyzer(), *args)
+    # Columnar results are already packed
+    return result if isinstance(result, ColumnarTokens) else encode_tokens(result)
+
+
+class ProcessTaggerPool(TaggerPool):
+    """
+    Worker processes that each own a tagger
+
+    Tokenization and Token construction run outside the server process,
+    so throughput scales with cores instead of being limited by the GIL.
+    MeCab memory-maps its dictionary files, so every worker shares the
+    same read-only pages through the OS page cache rather than holding
+    its own copy.
+    """
+
+    def _create_executor(self) -> Executor:
+        # forkserver avoids forking a process that already runs threads
+        method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=mp.get_context(method),
+            initializer=get_thread_analyzer  # Load each worker's tagger up front
+        )
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        return self._executor.submit(_run_encoded, fn, args)
+
+    def _decode(self, result):
+        return result if isinstance(result, ColumnarTokens) else decode_tokens(result)
+
+    def _active_count(self) -> int:
+        # Workers report nothing back while busy; every accepted task up to
+        # the worker count is running
+        return min(self._pending, self.size)
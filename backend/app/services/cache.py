@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from sqlalchemy.orm import Session
+from app.config import (
+    LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL, LOOKUP_CACHE_VERSION_CHECK_INTERVAL
+)
+from app.database import get_data_version
+
+# Returned by LRUCache.get when a key is not cached (None is a valid cached value)
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache with optional TTL and hit/miss counters"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: Maximum number of entries (0 disables caching)
+            ttl: Seconds an entry stays valid, or None for no expiry
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Get a cached value, or MISSING if absent or expired"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return MISSING
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, key: Hashable, value: Any) -> bool:
+        """
+        Refresh an entry's expiry and recency if it still holds value
+
+        Unlike set, never stores value: an entry that was replaced or
+        removed in the meantime is left as it is.
+
+        Returns:
+            Whether the entry was refreshed
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] is not value:
+                return False
+            self._data[key] = (value, time.monotonic() + self.ttl if self.ttl else None)
+            self._data.move_to_end(key)
+            return True
+
+    def pop(self, key: Hashable) -> bool:
+        """Remove an entry; returns whether it was present"""
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Lookup caches in front of DictionaryService and KanjiService
+word_cache = LRUCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL or None)
+kanji_cache = LRUCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL or None)
+
+_version_lock = threading.Lock()
+_known_version: Optional[int] = None
+_last_version_check = 0.0
+
+
+def invalidate_if_reimported(db: Session) -> None:
+    """
+    Clear lookup caches if the dictionary data changed
+
+    Import scripts bump the database's data version after writing, so a
+    reimport is picked up by a running server within the check interval.
+
+    Args:
+        db: Database session
+    """
+    global _known_version, _last_version_check
+
+    now = time.monotonic()
+    if now - _last_version_check < LOOKUP_CACHE_VERSION_CHECK_INTERVAL:
+        return
+
+    with _version_lock:
+        _last_version_check = now
+        version = get_data_version(db)
+        if version != _known_version:
+            if _known_version is not None:
+                word_cache.clear()
+                kanji_cache.clear()
+            _known_version = version
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Get counters for all lookup caches"""
+    return {
+        "word": word_cache.stats(),
+        "kanji": kanji_cache.stats()
+    }
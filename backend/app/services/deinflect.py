@@ -0,0 +1,302 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+# Word types, as bit flags. A rule only applies to a form whose type
+# matches its input type; the surface the user looked up matches any.
+V1 = 1 << 0      # Ichidan verb (食べる)
+V5 = 1 << 1      # Godan verb (書く)
+VK = 1 << 2      # Kuru verb (来る)
+VS = 1 << 3      # Suru verb (する, 勉強する)
+ADJ_I = 1 << 4   # I-adjective (高い); also ない/たい forms
+MASU = 1 << 5    # Polite ます form
+TE = 1 << 6      # Te form (食べて)
+ANY = (1 << 7) - 1
+
+# Word types that a dictionary entry can have
+DICTIONARY_TYPES = V1 | V5 | VK | VS | ADJ_I
+
+# Longest chain of rules tried for one surface (e.g. 食べさせられなかった)
+MAX_DEPTH = 6
+
+# Godan rows: dictionary ending, i-stem, a-stem, e-stem, o-stem, te form, ta form
+GODAN_ROWS = [
+    ("う", "い", "わ", "え", "お", "って", "った"),
+    ("く", "き", "か", "け", "こ", "いて", "いた"),
+    ("ぐ", "ぎ", "が", "げ", "ご", "いで", "いだ"),
+    ("す", "し", "さ", "せ", "そ", "して", "した"),
+    ("つ", "ち", "た", "て", "と", "って", "った"),
+    ("ぬ", "に", "な", "ね", "の", "んで", "んだ"),
+    ("ぶ", "び", "ば", "べ", "ぼ", "んで", "んだ"),
+    ("む", "み", "ま", "め", "も", "んで", "んだ"),
+    ("る", "り", "ら", "れ", "ろ", "って", "った"),
+]
+
+# Irregular stems of 来る (kanji and kana) and する: negative, masu, te/ta, provisional
+KURU_STEMS = [("来", "来", "来", "来"), ("こ", "き", "き", "く")]
+SURU_STEMS = ("し", "し", "し", "す")
+
+
+class Rule:
+    """Replace an inflected suffix with the suffix of a less inflected form"""
+
+    __slots__ = ("inflected", "base", "type_in", "type_out", "reason")
+
+    def __init__(self, inflected: str, base: str, type_in: int, type_out: int, reason: str):
+        self.inflected = inflected
+        self.base = base
+        self.type_in = type_in    # Types the inflected form may have
+        self.type_out = type_out  # Type of the resulting form
+        self.reason = reason
+
+
+class Deinflection:
+    """A candidate dictionary form and the conjugations that lead to the surface"""
+
+    __slots__ = ("word", "types", "reasons")
+
+    def __init__(self, word: str, types: int, reasons: Tuple[str, ...]):
+        self.word = word
+        self.types = types
+        self.reasons = reasons  # From the dictionary form outwards, e.g. ("polite", "past")
+
+    def __repr__(self):
+        return f"Deinflection({self.word!r}, {self.types}, {self.reasons!r})"
+
+
+def _verb_rules(stems: Iterable[Tuple[str, str, str, str, str, str, str]], base: str,
+                word_type: int) -> List[Rule]:
+    """
+    Build the conjugation rules of one verb class
+
+    Args:
+        stems: (ending, i-stem, a-stem, e-stem, o-stem, te form, ta form) rows;
+               each stem already includes what precedes the ending
+        base: Dictionary suffix, per row
+        word_type: Type of the dictionary form
+
+    Returns:
+        Rules mapping each conjugated suffix back to its dictionary suffix
+    """
+    rules = []
+    for ending, i, a, e, o, te, ta in stems:
+        dictionary = base + ending
+        for inflected, type_in, type_out, reason in [
+            (a + "ない", ADJ_I, word_type, "negative"),
+            (a + "ず", ANY, word_type, "negative"),
+            (a + "ぬ", ANY, word_type, "negative"),
+            (i + "ます", MASU, word_type, "polite"),
+            (i + "たい", ADJ_I, word_type, "desire"),
+            (i + "なさい", ANY, word_type, "polite imperative"),
+            (i + "ながら", ANY, word_type, "while"),
+            (i + "そう", ANY, word_type, "seems"),
+            (te, TE, word_type, "te"),
+            (ta, ANY, word_type, "past"),
+            (ta + "ら", ANY, word_type, "conditional"),
+            (ta + "り", ANY, word_type, "alternative"),
+            (e + "ば", ANY, word_type, "provisional"),
+            (o + "う", ANY, word_type, "volitional"),
+        ]:
+            rules.append(Rule(inflected, dictionary, type_in, type_out, reason))
+    return rules
+
+
+def _build_rules() -> List[Rule]:
+    rules = []
+
+    # Ichidan: the stem is the dictionary form without る
+    rules += _verb_rules([("る", "", "", "れ", "よ", "て", "た")], "", V1)
+    rules += [
+        Rule("ろ", "る", ANY, V1, "imperative"),
+        Rule("よ", "る", ANY, V1, "imperative"),
+        Rule("られる", "る", V1, V1, "passive/potential"),
+        Rule("れる", "る", V1, V1, "potential"),
+        Rule("させる", "る", V1, V1, "causative"),
+        Rule("させられる", "る", V1, V1, "causative passive"),
+    ]
+
+    # Godan
+    rules += _verb_rules([(u, i, a, e, o, te, ta) for u, i, a, e, o, te, ta in GODAN_ROWS], "", V5)
+    for u, i, a, e, o, te, ta in GODAN_ROWS:
+        rules += [
+            Rule(e, u, ANY, V5, "imperative"),
+            Rule(e + "る", u, V1, V5, "potential"),
+            Rule(a + "れる", u, V1, V5, "passive"),
+            Rule(a + "せる", u, V1, V5, "causative"),
+            Rule(a + "される", u, V1, V5, "causative passive"),
+        ]
+    # 行く/いく conjugates like a つ/る row in the te and ta forms
+    for stem in ("行", "い", "ゆ"):
+        rules += [
+            Rule(stem + "って", stem + "く", TE, V5, "te"),
+            Rule(stem + "った", stem + "く", ANY, V5, "past"),
+            Rule(stem + "ったら", stem + "く", ANY, V5, "conditional"),
+            Rule(stem + "ったり", stem + "く", ANY, V5, "alternative"),
+        ]
+
+    # Kuru
+    for negative, masu, te, provisional in KURU_STEMS:
+        dictionary = provisional + "る"
+        rules += [
+            Rule(negative + "ない", dictionary, ADJ_I, VK, "negative"),
+            Rule(negative + "ず", dictionary, ANY, VK, "negative"),
+            Rule(masu + "ます", dictionary, MASU, VK, "polite"),
+            Rule(masu + "たい", dictionary, ADJ_I, VK, "desire"),
+            Rule(masu + "なさい", dictionary, ANY, VK, "polite imperative"),
+            Rule(te + "て", dictionary, TE, VK, "te"),
+            Rule(te + "た", dictionary, ANY, VK, "past"),
+            Rule(te + "たら", dictionary, ANY, VK, "conditional"),
+            Rule(te + "たり", dictionary, ANY, VK, "alternative"),
+            Rule(provisional + "れば", dictionary, ANY, VK, "provisional"),
+            Rule(negative + "よう", dictionary, ANY, VK, "volitional"),
+            Rule(negative + "い", dictionary, ANY, VK, "imperative"),
+            Rule(negative + "られる", dictionary, V1, VK, "passive/potential"),
+            Rule(negative + "させる", dictionary, V1, VK, "causative"),
+        ]
+
+    # Suru, including suru nouns (勉強する -> 勉強)
+    negative, masu, te, provisional = SURU_STEMS
+    rules += [
+        Rule(negative + "ない", "する", ADJ_I, VS, "negative"),
+        Rule("せず", "する", ANY, VS, "negative"),
+        Rule(masu + "ます", "する", MASU, VS, "polite"),
+        Rule(masu + "たい", "する", ADJ_I, VS, "desire"),
+        Rule(masu + "なさい", "する", ANY, VS, "polite imperative"),
+        Rule(te + "て", "する", TE, VS, "te"),
+        Rule(te + "た", "する", ANY, VS, "past"),
+        Rule(te + "たら", "する", ANY, VS, "conditional"),
+        Rule(te + "たり", "する", ANY, VS, "alternative"),
+        Rule(provisional + "れば", "する", ANY, VS, "provisional"),
+        Rule("しよう", "する", ANY, VS, "volitional"),
+        Rule("しろ", "する", ANY, VS, "imperative"),
+        Rule("せよ", "する", ANY, VS, "imperative"),
+        Rule("される", "する", V1, VS, "passive"),
+        Rule("させる", "する", V1, VS, "causative"),
+        Rule("できる", "する", V1, VS, "potential"),
+        Rule("する", "", VS, VS, "suru verb"),
+    ]
+
+    # I-adjectives; ない and たい forms conjugate the same way
+    rules += [
+        Rule("かった", "い", ANY, ADJ_I, "past"),
+        Rule("くない", "い", ADJ_I, ADJ_I, "negative"),
+        Rule("くて", "い", ANY, ADJ_I, "te"),
+        Rule("く", "い", ANY, ADJ_I, "adverb"),
+        Rule("ければ", "い", ANY, ADJ_I, "provisional"),
+        Rule("かったら", "い", ANY, ADJ_I, "conditional"),
+        Rule("かったり", "い", ANY, ADJ_I, "alternative"),
+        Rule("かろう", "い", ANY, ADJ_I, "volitional"),
+        Rule("さ", "い", ANY, ADJ_I, "noun"),
+        Rule("すぎる", "い", V1, ADJ_I, "excess"),
+        Rule("そう", "い", ANY, ADJ_I, "seems"),
+    ]
+
+    # Polite forms of ます
+    rules += [
+        Rule("ました", "ます", ANY, MASU, "past"),
+        Rule("ません", "ます", ANY, MASU, "negative"),
+        Rule("ませんでした", "ます", ANY, MASU, "past negative"),
+        Rule("ましょう", "ます", ANY, MASU, "volitional"),
+        Rule("まして", "ます", ANY, MASU, "te"),
+    ]
+
+    # Auxiliaries attached to the te form
+    for te in ("て", "で"):
+        rules += [
+            Rule(te + "いる", te, V1, TE, "progressive"),
+            Rule(te + "る", te, V1, TE, "progressive"),
+            Rule(te + "しまう", te, V5, TE, "completion"),
+            Rule(te + "おく", te, V5, TE, "preparation"),
+            Rule(te + "ある", te, V5, TE, "resultative"),
+            Rule(te + "ください", te, ANY, TE, "request"),
+        ]
+    rules += [
+        Rule("ちゃう", "て", V5, TE, "completion"),
+        Rule("じゃう", "で", V5, TE, "completion"),
+        Rule("とく", "て", V5, TE, "preparation"),
+        Rule("どく", "で", V5, TE, "preparation"),
+    ]
+
+    return rules
+
+
+def _index_rules(rules: List[Rule]) -> Dict[int, Dict[str, List[Rule]]]:
+    """Group rules by inflected suffix length, then suffix"""
+    index: Dict[int, Dict[str, List[Rule]]] = defaultdict(lambda: defaultdict(list))
+    for rule in rules:
+        index[len(rule.inflected)][rule.inflected].append(rule)
+    return {length: dict(by_suffix) for length, by_suffix in index.items()}
+
+
+RULES = _build_rules()
+_RULES_BY_LENGTH = _index_rules(RULES)
+
+
+def deinflect(word: str) -> List[Deinflection]:
+    """
+    Generate candidate dictionary forms for a possibly conjugated word
+
+    Rules are applied repeatedly, so chains such as
+    食べさせられました -> 食べさせられます -> 食べさせられる -> 食べさせる -> 食べる
+    are unwound. Candidates are not checked against the dictionary; a
+    candidate is only valid if an entry with one of its types exists.
+
+    Args:
+        word: Surface form (e.g. 食べました, 高かった)
+
+    Returns:
+        The word itself followed by every candidate, fewest rules first
+    """
+    results = [Deinflection(word, ANY, ())]
+    seen = {(word, ANY)}
+    frontier = results[:]
+
+    for _ in range(MAX_DEPTH):
+        next_frontier = []
+        for candidate in frontier:
+            text = candidate.word
+            for length, by_suffix in _RULES_BY_LENGTH.items():
+                if length > len(text):
+                    continue
+                for rule in by_suffix.get(text[-length:], ()):
+                    if not candidate.types & rule.type_in:
+                        continue
+                    new_word = text[:-length] + rule.base
+                    if not new_word or (new_word, rule.type_out) in seen:
+                        continue
+                    seen.add((new_word, rule.type_out))
+                    deinflected = Deinflection(new_word, rule.type_out, (rule.reason,) + candidate.reasons)
+                    results.append(deinflected)
+                    next_frontier.append(deinflected)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    return results
+
+
+def word_types(pos_values: Iterable[str]) -> int:
+    """
+    Map JMdict part-of-speech descriptions to word type flags
+
+    Args:
+        pos_values: Part-of-speech strings of an entry's senses, each
+                    listing one or more parts of speech separated by "; "
+                    (e.g. "Ichidan verb", "noun (common) (futsuumeishi);
+                    noun or participle which takes the aux. verb suru")
+
+    Returns:
+        Bitwise OR of the matching word types (0 if none can conjugate)
+    """
+    types = 0
+    for pos in (part for value in pos_values for part in value.split("; ")):
+        if pos.startswith("Ichidan verb"):
+            types |= V1
+        elif pos.startswith("Godan verb"):
+            types |= V5
+        elif pos.startswith("Kuru verb"):
+            types |= VK
+        elif pos.startswith("suru verb") or "aux. verb suru" in pos:
+            types |= VS
+        elif pos.startswith("adjective (keiyoushi)"):
+            types |= ADJ_I
+    return types
@@ -1,8 +1,36 @@
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, List, Optional
 from collections import defaultdict
-from app.models import Word, WordMeaning
+from app.models import Word, WordForm, WordMeaning
 from app.schemas import WordResponse, WordMeaningDetail
+from app.services.cache import MISSING, word_cache, invalidate_if_reimported
+from app.services.deinflect import deinflect, word_types
+from app.services.dictionary_binary import get_binary_dictionary
+from app.services.kanji import is_kanji
+from app.utils.iterables import chunked
+
+
+# Maximum number of bound parameters per IN (...) query
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _is_japanese(char: str) -> bool:
+    """Check whether a character is kana (full or half width) or kanji"""
+    return 0x3040 <= ord(char) <= 0x30FF or 0xFF66 <= ord(char) <= 0xFF9F or is_kanji(char)
+
+
+def normalize_form(word: str) -> str:
+    """
+    Normalize a lookup key to a dictionary form
+
+    UniDic lemmas of loanwords carry their source word after a hyphen
+    (e.g. "パン-pão", "カフェ-café"); only the Japanese part is a
+    dictionary form.
+    """
+    head, sep, tail = word.partition("-")
+    if sep and head and tail and not any(_is_japanese(char) for char in tail):
+        return head
+    return word
 
 
 class DictionaryService:
@@ -20,16 +48,132 @@ class DictionaryService:
         Returns:
             WordResponse with meanings and metadata, or None if not found
         """
-        # Try exact match first
-        word_entry = db.query(Word).filter(Word.word == word).first()
+        binary = get_binary_dictionary()
+        if binary is not None:
+            return binary.lookup(normalize_form(word))
+
+        invalidate_if_reimported(db)
+        cached = word_cache.get(word)
+        if cached is not MISSING:
+            return cached
+
+        # Any spelling or reading matches; the most common entry wins
+        word_entry = (
+            db.query(Word)
+            .join(WordForm, WordForm.word_id == Word.id)
+            .filter(WordForm.form == normalize_form(word))
+            .order_by(WordForm.priority, Word.id)
+            .options(selectinload(Word.meanings))
+            .first()
+        )
+
+        result = DictionaryService._to_response(word_entry) if word_entry else None
+        word_cache.set(word, result)
+        return result
+
+    @staticmethod
+    def lookup_words(db: Session, words: List[str],
+                     cache_misses: bool = True) -> Dict[str, Optional[WordResponse]]:
+        """
+        Look up many words at once
+
+        Resolves all words with a fixed number of set-based queries and
+        loads their meanings eagerly, instead of several round trips per word.
+        Matching follows lookup_word: any form, ranked by commonness.
+
+        Args:
+            db: Database session
+            words: Japanese words to look up (duplicates are resolved once)
+            cache_misses: Whether words that are not found are cached too
+
+        Returns:
+            Mapping of each distinct input word to its WordResponse, or None if not found
+        """
+        keys = list(dict.fromkeys(word for word in words if word))
+
+        binary = get_binary_dictionary()
+        if binary is not None:
+            return {key: binary.lookup(normalize_form(key)) for key in keys}
+
+        invalidate_if_reimported(db)
+        results: Dict[str, Optional[WordResponse]] = {}
+        uncached = []
+        for key in keys:
+            cached = word_cache.get(key)
+            if cached is MISSING:
+                uncached.append(key)
+            else:
+                results[key] = cached
+
+        forms = {key: normalize_form(key) for key in uncached}
+        found: Dict[str, Word] = {}
 
-        # If not found, try by reading
-        if not word_entry:
-            word_entry = db.query(Word).filter(Word.reading == word).first()
+        for chunk in chunked(list(dict.fromkeys(forms.values())), LOOKUP_CHUNK_SIZE):
+            rows = (
+                db.query(WordForm.form, Word)
+                .join(Word, Word.id == WordForm.word_id)
+                .filter(WordForm.form.in_(chunk))
+                .order_by(WordForm.priority, Word.id)
+                .options(selectinload(Word.meanings))
+                .all()
+            )
+            for form, entry in rows:
+                # Keep the best-ranked entry per form, as lookup_word would
+                found.setdefault(form, entry)
+
+        for key in uncached:
+            entry = found.get(forms[key])
+            result = DictionaryService._to_response(entry) if entry else None
+            if result is not None or cache_misses:
+                word_cache.set(key, result)
+            results[key] = result
+
+        return {key: results[key] for key in keys}
+
+    @staticmethod
+    def lookup_inflected(db: Session, words: List[str]) -> Dict[str, Optional[WordResponse]]:
+        """
+        Look up words that may be conjugated
 
-        if not word_entry:
-            return None
+        Every candidate dictionary form of every word is resolved in one
+        lookup_words call. Candidates that are not words are not cached, so
+        they do not evict real entries. An exact match wins; otherwise the
+        candidate reached with the fewest rules whose entry can conjugate
+        that way (e.g. an Ichidan verb for 食べました -> 食べる) is
+        returned, with the conjugations listed in its inflection field.
 
+        Args:
+            db: Database session
+            words: Surface forms (e.g. 食べました, 高かった)
+
+        Returns:
+            Mapping of each distinct input word to its WordResponse, or None if not found
+        """
+        keys = list(dict.fromkeys(word for word in words if word))
+        candidates = {key: deinflect(normalize_form(key)) for key in keys}
+        entries = DictionaryService.lookup_words(
+            db, [candidate.word for options in candidates.values() for candidate in options],
+            cache_misses=False
+        )
+
+        results: Dict[str, Optional[WordResponse]] = {}
+        for key in keys:
+            results[key] = None
+            for candidate in candidates[key]:
+                entry = entries.get(candidate.word)
+                if entry is None:
+                    continue
+                if not candidate.reasons:
+                    results[key] = entry
+                    break
+                if word_types(meaning.pos for meaning in entry.meanings) & candidate.types:
+                    results[key] = entry.model_copy(update={"inflection": list(candidate.reasons)})
+                    break
+        return results
+
+    @staticmethod
+    def _to_response(word_entry: Word) -> WordResponse:
+        """Convert a Word row and its meanings to a WordResponse"""
         # Group meanings by part of speech
         meanings_by_pos = defaultdict(list)
         for meaning in word_entry.meanings:
@@ -53,4 +197,7 @@ class DictionaryService:
     @staticmethod
     def get_word_count(db: Session) -> int:
         """Get total number of words in database"""
+        binary = get_binary_dictionary()
+        if binary is not None:
+            return binary.entry_count
         return db.query(Word).count()
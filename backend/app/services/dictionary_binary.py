@@ -0,0 +1,246 @@
+"""
+Read-only memory-mapped JMdict format
+
+Layout (little-endian):
+
+    header      magic, version, key count, entry count, section offsets
+    key table   fixed-size records (key offset, key length, priority, entry index)
+                sorted by key, then priority, so the best entry for a form comes first
+    key blob    UTF-8 forms (every kanji spelling and reading of each entry)
+    entry table fixed-size records (payload offset, payload length)
+    payload     packed entries: flags, jlpt, frequency, word, reading and
+                meanings grouped by part of speech as length-prefixed strings
+
+Lookups binary-search the key table directly in the mapped file, so several
+server processes share one copy of the data through the OS page cache.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+from app.config import DICTIONARY_BACKEND, DICTIONARY_BIN_PATH, LOOKUP_CACHE_VERSION_CHECK_INTERVAL
+from app.schemas import WordResponse, WordMeaningDetail
+
+MAGIC = b"JMDB"
+FORMAT_VERSION = 2
+
+HEADER = struct.Struct("<4sIIIQQQQ")
+KEY_RECORD = struct.Struct("<IHHI")
+ENTRY_RECORD = struct.Struct("<II")
+ENTRY_FIXED = struct.Struct("<Bbi")
+U16 = struct.Struct("<H")
+
+
+class BinaryEntry:
+    """Dictionary entry as written to the compiled file"""
+
+    __slots__ = ("word", "reading", "is_common", "jlpt_level", "frequency", "meanings", "forms")
+
+    def __init__(self, word: str, reading: str, is_common: bool, jlpt_level: Optional[int],
+                 frequency: Optional[int], meanings: List[Tuple[str, List[str]]],
+                 forms: List[Tuple[str, int]]):
+        self.word = word
+        self.reading = reading
+        self.is_common = is_common
+        self.jlpt_level = jlpt_level
+        self.frequency = frequency
+        self.meanings = meanings  # [(pos, [gloss, ...]), ...]
+        self.forms = forms  # [(form, priority), ...]
+
+
+def _pack_str(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return U16.pack(len(data)) + data
+
+
+def _pack_entry(entry: BinaryEntry) -> bytes:
+    parts = [
+        ENTRY_FIXED.pack(
+            1 if entry.is_common else 0,
+            entry.jlpt_level if entry.jlpt_level is not None else -1,
+            entry.frequency if entry.frequency is not None else -1
+        ),
+        _pack_str(entry.word),
+        _pack_str(entry.reading),
+        U16.pack(len(entry.meanings))
+    ]
+    for pos, glosses in entry.meanings:
+        parts.append(_pack_str(pos))
+        parts.append(U16.pack(len(glosses)))
+        parts.extend(_pack_str(gloss) for gloss in glosses)
+    return b"".join(parts)
+
+
+def write_binary_dictionary(entries: Iterable[BinaryEntry], path: Path) -> Tuple[int, int]:
+    """
+    Compile entries into the binary format
+
+    The file is written next to the destination and moved into place
+    atomically, so running servers never see a partial file.
+
+    Args:
+        entries: Entries in id order (earlier entries win ties in priority)
+        path: Destination file
+
+    Returns:
+        (number of entries, number of keys)
+    """
+    keys: List[Tuple[bytes, int, int]] = []
+    entry_records = bytearray()
+    payload = bytearray()
+
+    count = 0
+    for index, entry in enumerate(entries):
+        packed = _pack_entry(entry)
+        entry_records += ENTRY_RECORD.pack(len(payload), len(packed))
+        payload += packed
+        for form, priority in entry.forms:
+            keys.append((form.encode("utf-8"), priority, index))
+        count = index + 1
+
+    keys.sort()
+
+    key_table = bytearray()
+    key_blob = bytearray()
+    for key, priority, index in keys:
+        key_table += KEY_RECORD.pack(len(key_blob), len(key), priority, index)
+        key_blob += key
+
+    keys_offset = HEADER.size
+    key_blob_offset = keys_offset + len(key_table)
+    entries_offset = key_blob_offset + len(key_blob)
+    payload_offset = entries_offset + len(entry_records)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, len(keys), count,
+            keys_offset, key_blob_offset, entries_offset, payload_offset
+        ))
+        f.write(key_table)
+        f.write(key_blob)
+        f.write(entry_records)
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+    return count, len(keys)
+
+
+class BinaryDictionary:
+    """Word lookups served from a memory-mapped compiled dictionary"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.inode = os.fstat(f.fileno()).st_ino
+        self._view = memoryview(self._mm)
+
+        (magic, version, self.key_count, self.entry_count, self._keys_offset,
+         self._key_blob_offset, self._entries_offset, self._payload_offset) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a compiled dictionary (format {FORMAT_VERSION}): {self.path}")
+
+    def close(self):
+        self._view.release()
+        self._mm.close()
+
+    def _key_at(self, position: int) -> Tuple[bytes, int]:
+        key_offset, key_length, _, index = KEY_RECORD.unpack_from(
+            self._mm, self._keys_offset + position * KEY_RECORD.size
+        )
+        start = self._key_blob_offset + key_offset
+        return self._mm[start:start + key_length], index
+
+    def _find(self, key: bytes) -> Optional[int]:
+        """Binary search for the best-ranked entry index stored under key"""
+        low, high = 0, self.key_count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key_at(mid)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.key_count:
+            found, index = self._key_at(low)
+            if found == key:
+                return index
+        return None
+
+    def _read_str(self, position: int) -> Tuple[str, int]:
+        (length,) = U16.unpack_from(self._mm, position)
+        position += U16.size
+        # Decode straight from the mapping without an intermediate bytes copy
+        return str(self._view[position:position + length], "utf-8"), position + length
+
+    def _entry(self, index: int) -> WordResponse:
+        offset, _ = ENTRY_RECORD.unpack_from(self._mm, self._entries_offset + index * ENTRY_RECORD.size)
+        position = self._payload_offset + offset
+
+        is_common, jlpt_level, frequency = ENTRY_FIXED.unpack_from(self._mm, position)
+        position += ENTRY_FIXED.size
+        word, position = self._read_str(position)
+        reading, position = self._read_str(position)
+        (group_count,) = U16.unpack_from(self._mm, position)
+        position += U16.size
+
+        meanings = []
+        for _ in range(group_count):
+            pos, position = self._read_str(position)
+            (gloss_count,) = U16.unpack_from(self._mm, position)
+            position += U16.size
+            definitions = []
+            for _ in range(gloss_count):
+                gloss, position = self._read_str(position)
+                definitions.append(gloss)
+            meanings.append(WordMeaningDetail(pos=pos, definitions=definitions))
+
+        return WordResponse(
+            word=word,
+            reading=reading,
+            meanings=meanings,
+            is_common=bool(is_common),
+            jlpt_level=jlpt_level if jlpt_level >= 0 else None,
+            frequency=frequency if frequency >= 0 else None
+        )
+
+    def lookup(self, word: str) -> Optional[WordResponse]:
+        """Look up a word by any of its forms, most common entry first"""
+        index = self._find(word.encode("utf-8"))
+        return self._entry(index) if index is not None else None
+
+
+_dictionary: Optional[BinaryDictionary] = None
+_dictionary_lock = threading.Lock()
+_last_check = 0.0
+
+
+def get_binary_dictionary() -> Optional[BinaryDictionary]:
+    """
+    Get the compiled dictionary when DICTIONARY_BACKEND is "mmap"
+
+    The file is reopened when it has been replaced by a new compile.
+
+    Returns:
+        BinaryDictionary, or None when the SQLite backend is configured
+    """
+    global _dictionary, _last_check
+
+    if DICTIONARY_BACKEND != "mmap":
+        return None
+
+    now = time.monotonic()
+    if _dictionary is not None and now - _last_check < LOOKUP_CACHE_VERSION_CHECK_INTERVAL:
+        return _dictionary
+
+    with _dictionary_lock:
+        _last_check = now
+        path = Path(DICTIONARY_BIN_PATH)
+        if _dictionary is None or os.stat(path).st_ino != _dictionary.inode:
+            # The previous mapping is left for in-flight readers and freed by GC
+            _dictionary = BinaryDictionary(path)
+    return _dictionary
@@ -0,0 +1,202 @@
+import asyncio
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from app.config import DOCUMENT_CACHE_SIZE, DOCUMENT_CACHE_TTL
+from app.schemas import DocumentEdit, Token, TokenSplice
+from app.services.analyzer import analyze_batch, split_sentences
+from app.services.cache import MISSING, LRUCache
+
+
+class DocumentVersionConflict(ValueError):
+    """Raised when edits are based on a different document version"""
+
+
+class Sentence:
+    """Immutable sentence text and its tokens (offsets relative to the sentence)"""
+
+    __slots__ = ("text", "tokens")
+
+    def __init__(self, text: str, tokens: List[Token]):
+        self.text = text
+        self.tokens = tokens
+
+
+def _absolute(tokens: List[Token], start: int) -> List[Token]:
+    """Shift sentence-relative tokens to document offsets"""
+    return [token.model_copy(update={"start": token.start + start, "end": token.end + start})
+            for token in tokens]
+
+
+async def _analyze_sentences(texts: List[str]) -> Dict[str, List[Token]]:
+    """Tokenize distinct sentences on the tagger pool"""
+    distinct = list(dict.fromkeys(texts))
+    if not distinct:
+        return {}
+    return dict(zip(distinct, await analyze_batch(distinct)))
+
+
+class AnalyzedDocument:
+    """
+    A document kept as sentences with cached tokens
+
+    Sentences partition the text exactly (see split_sentences), so an edit
+    only needs the sentences around it to be split and tokenized again.
+    """
+
+    def __init__(self, text: str, starts: List[int], sentences: List[Sentence]):
+        self.text = text
+        self.starts = starts        # Document offset of each sentence
+        self.sentences = sentences
+        self.version = 0
+        self.lock = asyncio.Lock()  # Serializes edits to this document
+
+    @classmethod
+    async def analyze(cls, text: str) -> "AnalyzedDocument":
+        """Split and tokenize a whole document"""
+        pieces = list(split_sentences(text))
+        tokens = await _analyze_sentences([piece for _, piece in pieces])
+        return cls(
+            text,
+            [start for start, _ in pieces],
+            [Sentence(piece, tokens[piece]) for _, piece in pieces]
+        )
+
+    def tokens(self) -> List[Token]:
+        """All tokens with document offsets"""
+        return [
+            token
+            for start, sentence in zip(self.starts, self.sentences)
+            for token in _absolute(sentence.tokens, start)
+        ]
+
+    async def apply_edits(self, version: int, edits: List[DocumentEdit]) -> Tuple[int, List[TokenSplice]]:
+        """
+        Apply edits and re-tokenize only the sentences they touch
+
+        Edits are applied in order, each against the text produced by the
+        previous one. Either all edits are applied or none is.
+
+        Args:
+            version: Document version the edits are based on
+            edits: Replacements of text[start:end]
+
+        Returns:
+            Tuple of (new version, one splice per edit to be applied to
+            the token list in order)
+
+        Raises:
+            DocumentVersionConflict: If version is not the current version
+            ValueError: If an edit range is outside the document
+        """
+        async with self.lock:
+            if version != self.version:
+                raise DocumentVersionConflict(
+                    f"Edits are based on version {version}, document is at version {self.version}"
+                )
+
+            text, starts, sentences = self.text, self.starts, self.sentences
+            splices = []
+            for edit in edits:
+                text, starts, sentences, splice = await self._apply_edit(text, starts, sentences, edit)
+                splices.append(splice)
+
+            self.text, self.starts, self.sentences = text, starts, sentences
+            self.version += 1
+            return self.version, splices
+
+    @staticmethod
+    async def _apply_edit(text: str, starts: List[int], sentences: List[Sentence],
+                          edit: DocumentEdit) -> Tuple[str, List[int], List[Sentence], TokenSplice]:
+        if not 0 <= edit.start <= edit.end <= len(text):
+            raise ValueError(f"Edit range {edit.start}-{edit.end} is outside the document (length {len(text)})")
+
+        delta = len(edit.text) - (edit.end - edit.start)
+        new_text = text[:edit.start] + edit.text + text[edit.end:]
+
+        # Re-split from one sentence before the edit (closing brackets attach
+        # to the previous sentence) until a new piece ends on an old boundary
+        # past the edit; splitting from there on is unchanged. Removing a
+        # terminator merges the following sentences, and pieces cut at
+        # MAX_SENTENCE_LENGTH all move, so this may reach well past the edit.
+        first = max(bisect_right(starts, edit.start) - 2, 0)
+        last = len(sentences) - 1
+        edit_end = edit.start + len(edit.text)
+        new = []
+        for start, piece in split_sentences(new_text, start=starts[first] if sentences else 0):
+            new.append((start, piece))
+            end = start + len(piece)
+            if end >= edit_end:
+                index = bisect_left(starts, end - delta)
+                if index < len(starts) and starts[index] == end - delta:
+                    last = index - 1
+                    break
+
+        old_starts = starts[first:last + 1]
+        old = sentences[first:last + 1]
+
+        # Sentences at either end of the region that did not change keep
+        # their tokens and are left out of the splice
+        prefix = 0
+        while (prefix < min(len(old), len(new))
+               and old_starts[prefix] == new[prefix][0] and old[prefix].text == new[prefix][1]):
+            prefix += 1
+        suffix = 0
+        while (suffix < min(len(old), len(new)) - prefix
+               and old_starts[-1 - suffix] + delta == new[-1 - suffix][0]
+               and old[-1 - suffix].text == new[-1 - suffix][1]):
+            suffix += 1
+
+        removed = old[prefix:len(old) - suffix]
+        added = new[prefix:len(new) - suffix]
+
+        reusable = {sentence.text: sentence.tokens for sentence in removed}
+        analyzed = await _analyze_sentences([piece for _, piece in added if piece not in reusable])
+        added_sentences = [
+            Sentence(piece, reusable[piece] if piece in reusable else analyzed[piece])
+            for _, piece in added
+        ]
+
+        splice_from = first + prefix
+        splice_to = first + len(old) - suffix
+        splice = TokenSplice(
+            index=sum(len(sentence.tokens) for sentence in sentences[:splice_from]),
+            delete=sum(len(sentence.tokens) for sentence in removed),
+            tokens=[
+                token
+                for (start, _), sentence in zip(added, added_sentences)
+                for token in _absolute(sentence.tokens, start)
+            ],
+            shift=delta
+        )
+
+        new_starts = starts[:splice_from] + [start for start, _ in added] + \
+            [start + delta for start in starts[splice_to:]]
+        new_sentences = sentences[:splice_from] + added_sentences + sentences[splice_to:]
+        return new_text, new_starts, new_sentences, splice
+
+
+class DocumentStore:
+    """Analyzed documents by client-chosen id, evicted by LRU and TTL"""
+
+    def __init__(self, maxsize: int, ttl: Optional[float]):
+        self._documents = LRUCache(maxsize, ttl)
+
+    def get(self, document_id: str) -> Optional[AnalyzedDocument]:
+        document = self._documents.get(document_id)
+        return None if document is MISSING else document
+
+    def put(self, document_id: str, document: AnalyzedDocument) -> None:
+        self._documents.set(document_id, document)
+
+    def touch(self, document_id: str, document: AnalyzedDocument) -> None:
+        """Refresh the expiry of a document, unless it was replaced or deleted meanwhile"""
+        self._documents.touch(document_id, document)
+
+    def delete(self, document_id: str) -> bool:
+        return self._documents.pop(document_id)
+
+    def stats(self):
+        return self._documents.stats()
+
+
+document_store = DocumentStore(DOCUMENT_CACHE_SIZE, DOCUMENT_CACHE_TTL or None)
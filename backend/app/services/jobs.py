@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import List, NamedTuple, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app.config import (
+    TRANSLATION_JOB_CHUNK_CHARS, TRANSLATION_JOB_MAX_ATTEMPTS, TRANSLATION_JOB_WORKERS
+)
+from app.database import Base, SessionLocal, engine
+from app.models import TranslationChunk, TranslationJob
+from app.schemas import TranslateResponse, TranslationJobResponse
+from app.services.analyzer import split_sentences
+from app.services.translation_cache import is_cacheable, translate_cached
+from app.services.translator import join_sentences
+
+logger = logging.getLogger(__name__)
+
+# Longest an idle worker waits before looking for chunks again
+IDLE_POLL_INTERVAL = 5.0
+# Longest wait before retrying a failed chunk (doubles per attempt from 1s)
+MAX_RETRY_DELAY = 60.0
+
+
+def chunk_text(text: str, max_chars: int = TRANSLATION_JOB_CHUNK_CHARS) -> List[str]:
+    """
+    Cut text into chunks of whole sentences
+
+    Sentences are only split when a single one is longer than max_chars.
+    Concatenating the chunks reproduces the text exactly.
+
+    Args:
+        text: Text to cut
+        max_chars: Target chunk length
+
+    Returns:
+        List of chunks
+    """
+    chunks = []
+    current = ""
+    for _, sentence in split_sentences(text, max_length=max_chars):
+        if current and len(current) + len(sentence) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ClaimedChunk(NamedTuple):
+    id: int
+    job_id: str
+    text: str
+    method: str
+    source: str
+    target: str
+
+
+async def translate_chunk(chunk: ClaimedChunk) -> TranslateResponse:
+    """
+    Translate a chunk sentence by sentence through the translation cache
+
+    Sentences translated by an earlier attempt come from the cache, so a
+    retry only repeats the sentences that failed rather than the whole chunk.
+
+    Args:
+        chunk: Chunk returned by claim_chunk
+
+    Returns:
+        TranslateResponse for the whole chunk, or the first sentence error
+    """
+    pieces = [piece for _, piece in split_sentences(chunk.text)]
+    responses = await asyncio.gather(*[
+        translate_cached(piece, chunk.source, chunk.target, chunk.method)
+        for piece in pieces if piece.strip()
+    ])
+
+    failed = next((response for response in responses if not is_cacheable(response)), None)
+    if failed is not None:
+        return failed.model_copy(update={"original": chunk.text})
+
+    translations = iter(response.translation for response in responses)
+    return TranslateResponse(
+        original=chunk.text,
+        translation=join_sentences(pieces, [next(translations) if piece.strip() else "" for piece in pieces]),
+        method=chunk.method
+    )
+
+
+class TranslationJobService:
+    """Persistence of translation jobs and their chunks"""
+
+    @staticmethod
+    def create_tables():
+        """Create the job tables if the database predates them"""
+        Base.metadata.create_all(
+            bind=engine, tables=[TranslationJob.__table__, TranslationChunk.__table__]
+        )
+
+    @staticmethod
+    def create_job(db: Session, text: str, method: str, source: str, target: str) -> TranslationJob:
+        """
+        Store a job and its chunks for the workers to pick up
+
+        Args:
+            db: Database session
+            text: Text to translate
+            method: Resolved translation method (deepl, llamacpp)
+            source: Source language
+            target: Target language
+
+        Returns:
+            The new job
+        """
+        chunks = chunk_text(text)
+        job = TranslationJob(
+            id=uuid.uuid4().hex,
+            status="queued" if chunks else "completed",
+            method=method,
+            source=source,
+            target=target
+        )
+        db.add(job)
+        db.flush()
+        db.bulk_insert_mappings(TranslationChunk, [
+            {"job_id": job.id, "position": position, "text": chunk, "status": "pending", "attempts": 0}
+            for position, chunk in enumerate(chunks)
+        ])
+        db.commit()
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: str) -> Optional[TranslationJobResponse]:
+        """
+        Get a job's progress, and its translation once completed
+
+        Args:
+            db: Database session
+            job_id: Job id
+
+        Returns:
+            TranslationJobResponse, or None if there is no such job
+        """
+        job = db.get(TranslationJob, job_id)
+        if job is None:
+            return None
+
+        counts = dict(
+            db.query(TranslationChunk.status, func.count())
+            .filter(TranslationChunk.job_id == job_id)
+            .group_by(TranslationChunk.status)
+            .all()
+        )
+        total = sum(counts.values())
+        completed = counts.get("done", 0)
+        failed = counts.get("failed", 0)
+
+        translation = None
+        error = None
+        if job.status == "completed":
+            rows = (
+                db.query(TranslationChunk.text, TranslationChunk.translation)
+                .filter(TranslationChunk.job_id == job_id)
+                .order_by(TranslationChunk.position)
+                .all()
+            )
+            translation = join_sentences([row.text for row in rows], [row.translation for row in rows])
+        elif job.status == "failed":
+            error = (
+                db.query(TranslationChunk.error)
+                .filter(TranslationChunk.job_id == job_id, TranslationChunk.status == "failed")
+                .order_by(TranslationChunk.position)
+                .limit(1)
+                .scalar()
+            )
+
+        return TranslationJobResponse(
+            id=job.id,
+            status=job.status,
+            method=job.method,
+            source=job.source,
+            target=job.target,
+            chunks=total,
+            completed_chunks=completed,
+            failed_chunks=failed,
+            progress=(completed + failed) / total if total else 1.0,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+            translation=translation,
+            error=error
+        )
+
+    @staticmethod
+    def recover() -> int:
+        """
+        Return chunks interrupted by a shutdown to the queue
+
+        Returns:
+            Number of chunks requeued
+        """
+        with SessionLocal() as db:
+            requeued = db.execute(
+                update(TranslationChunk)
+                .where(TranslationChunk.status == "running")
+                .values(status="pending")
+            ).rowcount
+            db.commit()
+            return requeued
+
+    @staticmethod
+    def claim_chunk() -> Optional[ClaimedChunk]:
+        """
+        Mark the oldest pending chunk as running
+
+        Returns:
+            The claimed chunk, or None if no chunk is ready
+        """
+        with SessionLocal() as db:
+            while True:
+                row = (
+                    db.query(
+                        TranslationChunk.id, TranslationChunk.job_id, TranslationChunk.text,
+                        TranslationJob.method, TranslationJob.source, TranslationJob.target
+                    )
+                    .join(TranslationJob)
+                    .filter(
+                        TranslationChunk.status == "pending",
+                        (TranslationChunk.retry_at.is_(None)) | (TranslationChunk.retry_at <= time.time())
+                    )
+                    .order_by(TranslationChunk.id)
+                    .first()
+                )
+                if row is None:
+                    return None
+
+                # Another worker may have claimed it since the query
+                claimed = db.execute(
+                    update(TranslationChunk)
+                    .where(TranslationChunk.id == row.id, TranslationChunk.status == "pending")
+                    .values(status="running")
+                ).rowcount
+                if claimed:
+                    db.execute(
+                        update(TranslationJob)
+                        .where(TranslationJob.id == row.job_id, TranslationJob.status == "queued")
+                        .values(status="running")
+                    )
+                    db.commit()
+                    return ClaimedChunk(*row)
+                db.rollback()
+
+    @staticmethod
+    def next_retry_at() -> Optional[float]:
+        """Unix time at which the next chunk waiting for a retry becomes ready"""
+        with SessionLocal() as db:
+            return (
+                db.query(func.min(TranslationChunk.retry_at))
+                .filter(TranslationChunk.status == "pending", TranslationChunk.retry_at > time.time())
+                .scalar()
+            )
+
+    @staticmethod
+    def finish_chunk(chunk: ClaimedChunk, response: TranslateResponse) -> None:
+        """
+        Store a chunk's translation, or schedule a retry if it failed
+
+        A chunk fails for good after TRANSLATION_JOB_MAX_ATTEMPTS attempts.
+        The job is completed when no chunk is left to translate, or failed
+        if any chunk failed.
+
+        Args:
+            chunk: Chunk returned by claim_chunk
+            response: Translation result
+        """
+        with SessionLocal() as db:
+            row = db.get(TranslationChunk, chunk.id)
+            if row is None:
+                return
+            if is_cacheable(response):
+                row.status = "done"
+                row.translation = response.translation
+                row.error = None
+            else:
+                row.attempts += 1
+                row.error = response.translation
+                if row.attempts >= TRANSLATION_JOB_MAX_ATTEMPTS:
+                    row.status = "failed"
+                else:
+                    row.status = "pending"
+                    row.retry_at = time.time() + min(2.0 ** (row.attempts - 1), MAX_RETRY_DELAY)
+            db.flush()
+
+            remaining = (
+                db.query(func.count())
+                .select_from(TranslationChunk)
+                .filter(
+                    TranslationChunk.job_id == chunk.job_id,
+                    TranslationChunk.status.in_(("pending", "running"))
+                )
+                .scalar()
+            )
+            if not remaining:
+                failed = (
+                    db.query(TranslationChunk.id)
+                    .filter(TranslationChunk.job_id == chunk.job_id, TranslationChunk.status == "failed")
+                    .first()
+                )
+                job = db.get(TranslationJob, chunk.job_id)
+                job.status = "failed" if failed else "completed"
+            db.commit()
+
+
+class TranslationJobRunner:
+    """
+    Background workers translating job chunks
+
+    A fixed number of workers bounds the load jobs put on the translation
+    backend, however many jobs are queued. Sentences go through the
+    translation cache, so repeated passages (and sentences finished before
+    a retry or restart) are not translated again. Jobs are processed in
+    submission order.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        """Requeue interrupted chunks and start the workers"""
+        await run_in_threadpool(TranslationJobService.create_tables)
+        requeued = await run_in_threadpool(TranslationJobService.recover)
+        if requeued:
+            logger.info("Resuming translation jobs: %d interrupted chunks requeued", requeued)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; chunks in progress are resumed on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was submitted"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                await self._process_next()
+            except Exception:
+                # e.g. the database is locked by an import; keep the worker alive
+                logger.exception("Translation job worker error")
+                await asyncio.sleep(IDLE_POLL_INTERVAL)
+
+    async def _process_next(self) -> None:
+        """Translate one chunk, or wait until one may be ready"""
+        # Clear before looking, so a job submitted meanwhile is not missed
+        self._wakeup.clear()
+        chunk = await run_in_threadpool(TranslationJobService.claim_chunk)
+        if chunk is None:
+            retry_at = await run_in_threadpool(TranslationJobService.next_retry_at)
+            timeout = IDLE_POLL_INTERVAL if retry_at is None else \
+                min(max(retry_at - time.time(), 0.0), IDLE_POLL_INTERVAL)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        try:
+            response = await translate_chunk(chunk)
+        except Exception as e:
+            response = TranslateResponse(
+                original=chunk.text, translation=f"Translation error: {str(e)}", method=f"{chunk.method}_error"
+            )
+        await run_in_threadpool(TranslationJobService.finish_chunk, chunk, response)
+
+
+job_runner = TranslationJobRunner(TRANSLATION_JOB_WORKERS)
@@ -1,7 +1,29 @@
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, Iterable, List, Optional
 from app.models import Kanji, KanjiReading, KanjiMeaning
 from app.schemas import KanjiResponse, KanjiReadings
+from app.services.cache import MISSING, kanji_cache, invalidate_if_reimported
+from app.services.kanji_index import get_current_kanji_index
+from app.utils.iterables import chunked
+
+# Maximum number of bound parameters per IN (...) query
+LOOKUP_CHUNK_SIZE = 500
+
+
+def is_kanji(char: str) -> bool:
+    """Check whether a character is a CJK ideograph"""
+    code = ord(char)
+    return (
+        0x4E00 <= code <= 0x9FFF      # CJK Unified Ideographs
+        or 0x3400 <= code <= 0x4DBF   # Extension A
+        or 0xF900 <= code <= 0xFAFF   # Compatibility Ideographs
+        or 0x20000 <= code <= 0x2A6DF # Extension B
+    )
+
+
+def extract_kanji(texts: Iterable[str]) -> List[str]:
+    """Collect the distinct kanji in texts, in order of first appearance"""
+    return list(dict.fromkeys(char for text in texts for char in text if is_kanji(char)))
 
 
 class KanjiService:
@@ -19,11 +41,70 @@ class KanjiService:
         Returns:
             KanjiResponse with readings and meanings, or None if not found
         """
+        index = get_current_kanji_index(db)
+        if index is not None:
+            return index.lookup(character)
+
+        invalidate_if_reimported(db)
+        cached = kanji_cache.get(character)
+        if cached is not MISSING:
+            return cached
+
         kanji_entry = db.query(Kanji).filter(Kanji.character == character).first()
 
-        if not kanji_entry:
-            return None
+        result = KanjiService._to_response(kanji_entry) if kanji_entry else None
+        kanji_cache.set(character, result)
+        return result
+
+    @staticmethod
+    def lookup_kanji_batch(db: Session, characters: List[str]) -> Dict[str, Optional[KanjiResponse]]:
+        """
+        Look up many kanji characters at once
 
+        Args:
+            db: Database session
+            characters: Kanji characters to look up (duplicates are resolved once)
+
+        Returns:
+            Mapping of each distinct character to its KanjiResponse, or None if not found
+        """
+        keys = list(dict.fromkeys(characters))
+
+        index = get_current_kanji_index(db)
+        if index is not None:
+            return {key: index.lookup(key) for key in keys}
+
+        invalidate_if_reimported(db)
+        results: Dict[str, Optional[KanjiResponse]] = {}
+        uncached = []
+        for key in keys:
+            cached = kanji_cache.get(key)
+            if cached is MISSING:
+                uncached.append(key)
+            else:
+                results[key] = cached
+
+        found: Dict[str, Kanji] = {}
+
+        for chunk in chunked(uncached, LOOKUP_CHUNK_SIZE):
+            entries = (
+                db.query(Kanji)
+                .options(selectinload(Kanji.readings), selectinload(Kanji.meanings))
+                .filter(Kanji.character.in_(chunk))
+                .all()
+            )
+            found.update((entry.character, entry) for entry in entries)
+
+        for key in uncached:
+            result = KanjiService._to_response(found[key]) if key in found else None
+            kanji_cache.set(key, result)
+            results[key] = result
+
+        return {key: results[key] for key in keys}
+
+    @staticmethod
+    def _to_response(kanji_entry: Kanji) -> KanjiResponse:
+        """Convert a Kanji row and its readings/meanings to a KanjiResponse"""
         # Group readings by type
         readings = KanjiReadings()
         for reading in kanji_entry.readings:
@@ -0,0 +1,225 @@
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.config import LOOKUP_CACHE_VERSION_CHECK_INTERVAL
+from app.database import SessionLocal, get_data_version
+from app.models import Kanji, KanjiReading, KanjiMeaning
+from app.schemas import KanjiResponse, KanjiReadings
+
+logger = logging.getLogger(__name__)
+
+
+class KanjiRecord:
+    """Immutable in-memory kanji entry"""
+
+    __slots__ = (
+        "character", "radical", "stroke_count", "grade", "jlpt_level",
+        "frequency", "meanings", "on", "kun", "nanori"
+    )
+
+    def __init__(self, character: str, radical: Optional[str], stroke_count: Optional[int],
+                 grade: Optional[int], jlpt_level: Optional[int], frequency: Optional[int],
+                 meanings: Tuple[str, ...], on: Tuple[str, ...], kun: Tuple[str, ...],
+                 nanori: Tuple[str, ...]):
+        for name, value in zip(self.__slots__, (
+            character, radical, stroke_count, grade, jlpt_level,
+            frequency, meanings, on, kun, nanori
+        )):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("KanjiRecord is immutable")
+
+    def to_response(self) -> KanjiResponse:
+        return KanjiResponse(
+            character=self.character,
+            meanings=list(self.meanings),
+            readings=KanjiReadings(on=list(self.on), kun=list(self.kun), nanori=list(self.nanori)),
+            stroke_count=self.stroke_count,
+            grade=self.grade,
+            jlpt_level=self.jlpt_level,
+            radical=self.radical,
+            frequency=self.frequency
+        )
+
+
+class KanjiIndex:
+    """Memory-resident copy of the kanji tables, answering lookups without the database"""
+
+    def __init__(self, records: Dict[str, KanjiRecord], data_version: Optional[int] = None,
+                 load_seconds: float = 0.0):
+        self._records = records
+        self.data_version = data_version  # Dictionary data version the records were loaded from
+        self.load_seconds = load_seconds
+        self._memory_bytes: Optional[int] = None
+
+    @classmethod
+    def load(cls, db: Session) -> "KanjiIndex":
+        """
+        Load all kanji, readings and meanings with three flat queries
+
+        Args:
+            db: Database session
+
+        Returns:
+            Populated KanjiIndex
+        """
+        started = time.perf_counter()
+        # Read first, so an update committed while loading is detected later
+        data_version = get_data_version(db)
+        # Identical strings (readings such as "コウ", radicals) are shared
+        intern = sys.intern
+
+        readings: Dict[int, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        for kanji_id, reading_type, reading in (
+            db.query(KanjiReading.kanji_id, KanjiReading.reading_type, KanjiReading.reading)
+            .order_by(KanjiReading.id)
+        ):
+            readings[kanji_id][reading_type].append(intern(reading))
+
+        meanings: Dict[int, List[str]] = defaultdict(list)
+        for kanji_id, meaning in (
+            db.query(KanjiMeaning.kanji_id, KanjiMeaning.meaning)
+            .order_by(KanjiMeaning.kanji_id, KanjiMeaning.meaning_order, KanjiMeaning.id)
+        ):
+            meanings[kanji_id].append(intern(meaning))
+
+        records = {}
+        for row in db.query(
+            Kanji.id, Kanji.character, Kanji.radical, Kanji.stroke_count,
+            Kanji.grade, Kanji.jlpt_level, Kanji.frequency
+        ):
+            kanji_readings = readings.get(row.id, {})
+            records[row.character] = KanjiRecord(
+                character=row.character,
+                radical=intern(row.radical) if row.radical else None,
+                stroke_count=row.stroke_count,
+                grade=row.grade,
+                jlpt_level=row.jlpt_level,
+                frequency=row.frequency,
+                meanings=tuple(meanings.get(row.id, ())),
+                on=tuple(kanji_readings.get("on", ())),
+                kun=tuple(kanji_readings.get("kun", ())),
+                nanori=tuple(kanji_readings.get("nanori", ()))
+            )
+
+        return cls(records, data_version=data_version, load_seconds=time.perf_counter() - started)
+
+    def lookup(self, character: str) -> Optional[KanjiResponse]:
+        """Look up a kanji character, or None if not found"""
+        record = self._records.get(character)
+        return record.to_response() if record else None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def memory_footprint(self) -> int:
+        """Approximate memory used by the index in bytes (shared objects counted once)"""
+        if self._memory_bytes is not None:
+            return self._memory_bytes
+
+        seen = set()
+        total = sys.getsizeof(self._records)
+
+        def add(obj):
+            nonlocal total
+            if obj is not None and id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+
+        for key, record in self._records.items():
+            add(key)
+            add(record)
+            for name in KanjiRecord.__slots__:
+                value = getattr(record, name)
+                add(value)
+                if isinstance(value, tuple):
+                    for item in value:
+                        add(item)
+
+        # The index is immutable, so the footprint only needs computing once
+        self._memory_bytes = total
+        return total
+
+    def stats(self) -> Dict[str, float]:
+        """Get entry count, memory footprint and load time"""
+        return {
+            "entries": len(self._records),
+            "memory_bytes": self.memory_footprint(),
+            "load_seconds": round(self.load_seconds, 3)
+        }
+
+
+# Loaded at startup when KANJI_INDEX_PRELOAD is enabled
+_index: Optional[KanjiIndex] = None
+
+_version_lock = threading.Lock()
+_known_version: Optional[int] = None
+_last_version_check = 0.0
+_reloading = False
+
+
+def load_kanji_index(db: Session) -> KanjiIndex:
+    """Load the kanji index and make KanjiService use it"""
+    global _index, _known_version
+    index = KanjiIndex.load(db)
+    with _version_lock:
+        _index = index
+        if _known_version is None or index.data_version > _known_version:
+            _known_version = index.data_version
+    return index
+
+
+def get_kanji_index() -> Optional[KanjiIndex]:
+    """Get the preloaded kanji index, or None if it is not loaded"""
+    return _index
+
+
+def get_current_kanji_index(db: Session) -> Optional[KanjiIndex]:
+    """
+    Get the preloaded kanji index if it matches the dictionary data
+
+    The data version is checked like the lookup caches do (see
+    invalidate_if_reimported). After a dictionary update the index is
+    reloaded in a background thread; until it is ready None is returned,
+    so lookups fall back to the database instead of serving old data.
+
+    Args:
+        db: Database session
+
+    Returns:
+        KanjiIndex, or None if it is not loaded or out of date
+    """
+    global _known_version, _last_version_check, _reloading
+
+    index = _index
+    if index is None:
+        return None
+
+    now = time.monotonic()
+    if now - _last_version_check >= LOOKUP_CACHE_VERSION_CHECK_INTERVAL:
+        with _version_lock:
+            _last_version_check = now
+            _known_version = get_data_version(db)
+            if index.data_version != _known_version and not _reloading:
+                _reloading = True
+                threading.Thread(target=_reload_kanji_index, name="kanji-index-reload", daemon=True).start()
+
+    return index if index.data_version == _known_version else None
+
+
+def _reload_kanji_index() -> None:
+    global _reloading
+    db = SessionLocal()
+    try:
+        index = load_kanji_index(db)
+        logger.info("Reloaded kanji index: %d entries", len(index))
+    except Exception:
+        logger.exception("Reloading the kanji index failed")
+    finally:
+        db.close()
+        _reloading = False
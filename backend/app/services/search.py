@@ -0,0 +1,186 @@
+import re
+from sqlalchemy import distinct, func, or_, select, text
+from sqlalchemy.orm import Session, selectinload
+from typing import Dict, List, Optional, Tuple
+from app.database import SEARCH_ROWID_SHIFT
+from app.models import Word, WordForm
+from app.schemas import SearchResult
+from app.utils.kana import hiragana_to_katakana, katakana_to_hiragana, romaji_to_hiragana
+
+# Sorts after every other code point, closing a prefix range
+PREFIX_UPPER_BOUND = "\U0010ffff"
+
+# Pages through matching words in rowid (= commonness) order. Words match
+# through the stemmed index ("running" finds "run") or the unstemmed one,
+# where a half-typed last word ("runn") is still a prefix of the indexed word
+GLOSS_SEARCH_SQL = text("""
+    SELECT rowid FROM word_glosses_fts WHERE word_glosses_fts MATCH :query
+    UNION
+    SELECT rowid FROM word_glosses_prefix_fts WHERE word_glosses_prefix_fts MATCH :query
+    ORDER BY rowid
+    LIMIT :limit OFFSET :offset
+""")
+WORD_ID_MASK = (1 << SEARCH_ROWID_SHIFT) - 1
+
+
+def form_prefixes(query: str) -> List[str]:
+    """
+    Get the form prefixes to search for a query
+
+    Romaji is converted to kana, and kana queries match both hiragana and
+    katakana spellings (e.g. "pan" finds both ぱん... and パン...).
+
+    Returns:
+        Distinct prefixes, or an empty list if the query cannot match a form
+    """
+    query = query.strip()
+    if query.isascii():
+        # Drop a half-typed syllable ("tab" searches た...)
+        query = romaji_to_hiragana(re.sub(r"[^aiueon'\-]+$", "", query.lower())) or ""
+    if not query:
+        return []
+    hiragana = katakana_to_hiragana(query)
+    return list(dict.fromkeys([query, hiragana, hiragana_to_katakana(hiragana)]))
+
+
+def gloss_match_expression(query: str) -> str:
+    """
+    Build an FTS5 MATCH expression from free text
+
+    Every word must appear; the last one matches as a prefix so results
+    update while typing. Terms are quoted so FTS5 syntax is never interpreted.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class SearchService:
+    """Service for searching the dictionary by prefix or English gloss"""
+
+    @staticmethod
+    def search_forms(db: Session, query: str, limit: int, offset: int) -> Tuple[List[SearchResult], bool]:
+        """
+        Search words whose spelling or reading starts with query
+
+        Each prefix is an index range scan on (form, priority), so results
+        come out sorted (shortest/exact matches first) without a sort step.
+        A word with several matching forms (にほん/にっぽん) is listed once,
+        at its best-ranked form.
+
+        Args:
+            db: Database session
+            query: Kanji, kana or romaji prefix
+            limit: Maximum number of results
+            offset: Number of words to skip
+
+        Returns:
+            Tuple of (results, has_more)
+        """
+        wanted = limit + 1  # One extra word tells whether another page exists
+        matches: Dict[int, str] = {}  # word_id -> best matching form, in result order
+        earlier_ranges = []
+
+        for prefix in form_prefixes(query):
+            in_range = (WordForm.form >= prefix) & (WordForm.form < prefix + PREFIX_UPPER_BOUND)
+            new_words = in_range
+            if earlier_ranges:
+                # Words matched through an earlier prefix are listed there
+                new_words &= WordForm.word_id.not_in(
+                    select(WordForm.word_id).where(or_(*earlier_ranges))
+                )
+            earlier_ranges.append(in_range)
+
+            if offset:
+                # Skip whole ranges that fall before the requested page
+                range_size = db.query(func.count(distinct(WordForm.word_id))).filter(new_words).scalar()
+                if range_size <= offset:
+                    offset -= range_size
+                    continue
+
+            seen = set()
+            for form, word_id in (
+                db.query(WordForm.form, WordForm.word_id)
+                .filter(new_words)
+                .order_by(WordForm.form, WordForm.priority)
+                .yield_per(wanted)
+            ):
+                if word_id in seen:
+                    continue
+                seen.add(word_id)
+                if offset:
+                    offset -= 1
+                    continue
+                matches[word_id] = form
+                if len(matches) >= wanted:
+                    break
+            offset = 0
+            if len(matches) >= wanted:
+                break
+
+        page = list(matches)[:limit]
+        entries: Dict[int, Word] = {
+            entry.id: entry
+            for entry in db.query(Word)
+            .filter(Word.id.in_(page))
+            .options(selectinload(Word.meanings))
+        }
+        results = [
+            SearchService._to_result(entries[word_id], matched_form=matches[word_id])
+            for word_id in page if word_id in entries
+        ]
+        return results, len(matches) > limit
+
+    @staticmethod
+    def search_glosses(db: Session, query: str, limit: int, offset: int) -> Tuple[List[SearchResult], bool]:
+        """
+        Search words by English definition using the FTS5 gloss index
+
+        Matches are returned most common first rather than by text relevance:
+        bm25 ranking would score every match, which is too slow for terms
+        that occur in thousands of entries.
+
+        Args:
+            db: Database session
+            query: English words (stemmed, so "running" matches "run";
+                   the last one may be incomplete)
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Tuple of (results, has_more), best matches first
+        """
+        expression = gloss_match_expression(query)
+        if not expression:
+            return [], False
+
+        rowids = db.execute(
+            GLOSS_SEARCH_SQL,
+            {"query": expression, "limit": limit + 1, "offset": offset}
+        ).scalars().all()
+        word_ids = [rowid & WORD_ID_MASK for rowid in rowids]
+
+        page = word_ids[:limit]
+        entries: Dict[int, Word] = {
+            entry.id: entry
+            for entry in db.query(Word)
+            .filter(Word.id.in_(page))
+            .options(selectinload(Word.meanings))
+        }
+        results = [SearchService._to_result(entries[word_id]) for word_id in page if word_id in entries]
+        return results, len(word_ids) > limit
+
+    @staticmethod
+    def _to_result(word_entry: Word, matched_form: Optional[str] = None) -> SearchResult:
+        """Convert a Word row to a compact search result"""
+        meanings = sorted(word_entry.meanings, key=lambda meaning: meaning.sense_order or 0)
+        return SearchResult(
+            word=word_entry.word,
+            reading=word_entry.reading,
+            matched_form=matched_form,
+            is_common=word_entry.is_common,
+            glosses=list(dict.fromkeys(meaning.gloss for meaning in meanings))
+        )
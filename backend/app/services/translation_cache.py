@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, AsyncIterator, Dict, Optional, Union
+from fastapi.concurrency import run_in_threadpool
+from app.config import TRANSLATION_CACHE_MAX_ENTRIES, TRANSLATION_CACHE_PATH, TRANSLATION_CACHE_TTL
+from app.schemas import TranslateDelta, TranslateResponse
+from app.services.translator import get_translator
+
+# Fraction of max entries kept after an eviction pass
+EVICTION_TARGET = 0.9
+
+_LINE_BREAK = re.compile(r"\r\n?")
+# Whitespace other than line breaks, which separate sentences and paragraphs
+_HORIZONTAL_WHITESPACE = re.compile(r"[^\S\n]+")
+_SPACE_AROUND_LINE_BREAK = re.compile(r" ?\n ?")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache keys
+
+    NFKC folds width variants (ｶﾀｶﾅ, ＡＢＣ) and runs of spaces and tabs
+    are collapsed, so trivially different inputs share one translation.
+    Line breaks are kept (CRLF counts as LF), so paragraphs are not
+    served the translation of the same sentences run together.
+    """
+    text = _LINE_BREAK.sub("\n", unicodedata.normalize("NFKC", text))
+    text = _HORIZONTAL_WHITESPACE.sub(" ", text)
+    return _SPACE_AROUND_LINE_BREAK.sub("\n", text).strip()
+
+
+def translation_key(method: str, model: str, source: str, target: str, text: str) -> str:
+    """Cache key for a translation request"""
+    parts = [method, model, source.lower(), target.lower(), normalize_text(text)]
+    return hashlib.sha256("\0".join(parts).encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def is_cacheable(response: TranslateResponse) -> bool:
+    """Only successful translations are cached; errors must be retried"""
+    return response.translation is not None and not response.method.endswith("_error")
+
+
+class TranslationCache:
+    """
+    Persistent translation store with LRU eviction and expiry
+
+    Entries expire ttl seconds after they were written. Once more than
+    max_entries are stored, least recently used entries are deleted.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl: Optional[float]):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS translation_cache (
+                key TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                model TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_translation_cache_accessed ON translation_cache (accessed)"
+        )
+        self._count = self._connection.execute("SELECT COUNT(*) FROM translation_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached translation, or None if absent or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT translation, created FROM translation_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl and row[1] + self.ttl < now:
+                self._connection.execute("DELETE FROM translation_cache WHERE key = ?", (key,))
+                self._count -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE translation_cache SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, method: str, model: str, translation: str) -> None:
+        """Store a translation, evicting least recently used entries if full"""
+        if self.max_entries <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            existed = self._connection.execute(
+                "SELECT 1 FROM translation_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO translation_cache (key, method, model, translation, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, method, model, translation, now, now)
+            )
+            if not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete expired entries, then least recently used ones down to the target size"""
+        if self.ttl:
+            self.evictions += self._connection.execute(
+                "DELETE FROM translation_cache WHERE created < ?", (time.time() - self.ttl,)
+            ).rowcount
+        self._count = self._connection.execute("SELECT COUNT(*) FROM translation_cache").fetchone()[0]
+
+        excess = self._count - int(self.max_entries * EVICTION_TARGET)
+        if excess > 0:
+            self._connection.execute(
+                "DELETE FROM translation_cache WHERE key IN "
+                "(SELECT key FROM translation_cache ORDER BY accessed LIMIT ?)",
+                (excess,)
+            )
+            self._count -= excess
+            self.evictions += excess
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._count,
+                "maxsize": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+_cache: Optional[TranslationCache] = None
+_cache_lock = threading.Lock()
+
+# Upstream calls in progress, by cache key
+_in_flight: Dict[str, asyncio.Task] = {}
+
+
+def get_translation_cache() -> TranslationCache:
+    """Get or create the translation cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TranslationCache(
+                    TRANSLATION_CACHE_PATH, TRANSLATION_CACHE_MAX_ENTRIES, TRANSLATION_CACHE_TTL or None
+                )
+    return _cache
+
+
+async def translate_cached(text: str, source: str = "ja", target: str = "en",
+                           method: Optional[str] = None) -> TranslateResponse:
+    """
+    Translate text, reusing cached and in-progress translations
+
+    Concurrent requests for the same translation share one upstream call.
+    That call runs as its own task, so it completes (and is cached) even
+    if the request that started it is cancelled.
+
+    Args:
+        text: Text to translate
+        source: Source language
+        target: Target language
+        method: Translation method (none, deepl, llamacpp), or None for the default
+
+    Returns:
+        TranslateResponse with original set to this request's text
+    """
+    translator = get_translator(method=method)
+    if translator.method == "none":
+        return await translator.translate(text, source, target)
+
+    cache = get_translation_cache()
+    key = translation_key(translator.method, translator.model, source, target, text)
+
+    task = _in_flight.get(key)
+    if task is None:
+        # SQLite reads stay off the event loop
+        cached = await run_in_threadpool(cache.get, key)
+        if cached is not None:
+            return TranslateResponse(original=text, translation=cached, method=translator.method)
+        # Another request may have started the same translation meanwhile
+        task = _in_flight.get(key)
+
+    if task is None:
+        async def fetch() -> TranslateResponse:
+            response = await translator.translate(text, source, target)
+            if is_cacheable(response):
+                await run_in_threadpool(cache.set, key, translator.method, translator.model, response.translation)
+            return response
+
+        task = asyncio.ensure_future(fetch())
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    response = await asyncio.shield(task)
+    return response.model_copy(update={"original": text})
+
+
+async def translate_stream_cached(text: str, source: str = "ja", target: str = "en",
+                                  method: Optional[str] = None) -> AsyncIterator[Union[TranslateDelta, TranslateResponse]]:
+    """
+    Translate text, yielding the translation as it is generated
+
+    Cached translations are yielded as a single chunk. Backends without
+    streaming support translate the whole text first.
+
+    Args:
+        text: Text to translate
+        source: Source language
+        target: Target language
+        method: Translation method (none, deepl, llamacpp), or None for the default
+
+    Yields:
+        TranslateDelta chunks, then one TranslateResponse with the complete
+        translation (or the error)
+    """
+    translator = get_translator(method=method)
+    if not hasattr(translator, "translate_stream"):
+        response = await translate_cached(text, source, target, method)
+        if is_cacheable(response):
+            yield TranslateDelta(text=response.translation)
+        yield response
+        return
+
+    cache = get_translation_cache()
+    key = translation_key(translator.method, translator.model, source, target, text)
+    cached = await run_in_threadpool(cache.get, key)
+    if cached is not None:
+        yield TranslateDelta(text=cached)
+        yield TranslateResponse(original=text, translation=cached, method=translator.method)
+        return
+
+    chunks = []
+    try:
+        async for chunk in translator.translate_stream(text, source, target):
+            chunks.append(chunk)
+            yield TranslateDelta(text=chunk)
+    except Exception as e:
+        yield TranslateResponse(
+            original=text,
+            translation=f"Translation error: {str(e)}",
+            method=f"{translator.method}_error"
+        )
+        return
+
+    response = TranslateResponse(original=text, translation="".join(chunks), method=translator.method)
+    await run_in_threadpool(cache.set, key, translator.method, translator.model, response.translation)
+    yield response
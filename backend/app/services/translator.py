@@ -1,53 +1,404 @@
-from typing import Optional
-import os
-from app.config import TRANSLATION_METHOD, DEEPL_API_KEY
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+from app.config import (
+    TRANSLATION_METHOD, DEEPL_API_KEY, DEEPL_MAX_CONCURRENCY, DEEPL_TIMEOUT, MODEL_FILE,
+    LLAMACPP_URLS, LLAMACPP_PARALLEL, LLAMACPP_TIMEOUT, LLAMACPP_HEALTH_INTERVAL,
+    TRANSLATION_BREAKER_FAILURES, TRANSLATION_BREAKER_RESET
+)
 from app.schemas import TranslateResponse
+from app.services.analyzer import split_sentences
+
+# Completion tokens allowed per sentence
+LLAMACPP_MAX_TOKENS = 512
+# Seconds a llama.cpp /health check may take before the server counts as down
+LLAMACPP_HEALTH_TIMEOUT = 2.0
+# Weight of the newest request in a server's average latency
+LATENCY_SMOOTHING = 0.2
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend that keeps failing"""
+
+
+def is_backend_failure(error: Exception) -> bool:
+    """Whether an error means the backend is down or overloaded (not a bad request)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, httpx.TransportError)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a backend after repeated failures
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls fail immediately. Once reset_timeout seconds have passed, one
+    trial call is let through: success closes the circuit, failure opens
+    it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def allows_request(self) -> bool:
+        """Whether guard() would let a call through right now"""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._trial)
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """
+        Run a backend call through the breaker
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or a trial call is
+                already in progress
+        """
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial):
+            self.rejected += 1
+            retry = max(self.reset_timeout - (time.monotonic() - self._opened_at), 0)
+            raise CircuitOpenError(f"{self.name} is unavailable, retrying in {retry:.0f}s")
+
+        trial = state == "half_open"
+        self._trial = self._trial or trial
+        try:
+            yield
+        except Exception as e:
+            if is_backend_failure(e):
+                self.failures += 1
+                if trial or self.failures >= self.failure_threshold:
+                    self._opened_at = time.monotonic()
+            raise
+        else:
+            self.failures = 0
+            self._opened_at = None
+        finally:
+            if trial:
+                self._trial = False
+
+
+class BackendClient:
+    """
+    Pooled keep-alive connections to one translation backend
+
+    At most max_concurrency requests are in flight; further calls wait for
+    a free slot. Calls go through a circuit breaker, so while the backend
+    is down they fail immediately instead of holding slots until timeout.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, timeout: float):
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.breaker = CircuitBreaker(name, TRANSLATION_BREAKER_FAILURES, TRANSLATION_BREAKER_RESET)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            # Waiting for a connection is bounded by the semaphore, not the pool
+            timeout=httpx.Timeout(timeout, pool=None)
+        )
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Wait for a free slot and yield the client to make one request with
+
+        Raises:
+            CircuitOpenError: If the backend's circuit is open
+        """
+        async with self._slots:
+            async with self.breaker.guard():
+                self.in_flight += 1
+                try:
+                    yield self._client
+                finally:
+                    self.in_flight -= 1
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "failures": self.breaker.failures,
+            "rejected": self.breaker.rejected,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency
+        }
+
+
+class LlamaCppNode:
+    """One llama.cpp server and its load, health and latency"""
+
+    def __init__(self, url: str, parallel: int):
+        self.url = url.rstrip("/")
+        self.parallel = parallel
+        self.breaker = CircuitBreaker(f"llama.cpp at {self.url}", TRANSLATION_BREAKER_FAILURES,
+                                      TRANSLATION_BREAKER_RESET)
+        self.healthy = True  # Until a health check or connection error says otherwise
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.latency: Optional[float] = None  # Smoothed seconds per successful request
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.breaker.allows_request
+
+    def record_latency(self, seconds: float) -> None:
+        self.latency = seconds if self.latency is None else \
+            self.latency + LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "state": self.breaker.state,
+            "in_flight": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": self.latency * 1000 if self.latency is not None else None
+        }
+
+
+class LlamaCppRouter:
+    """
+    Spreads requests over llama.cpp replicas
+
+    Each request goes to the available server with the fewest outstanding
+    requests (ties go to the lower latency), and waits while every server's
+    slots are busy. Servers leave the rotation when their /health check
+    fails, when a connection to them fails, or while their circuit breaker
+    is open, and return once a health check passes.
+    """
+
+    def __init__(self, urls: List[str], parallel: int, timeout: float):
+        self.nodes = [LlamaCppNode(url, parallel) for url in urls]
+        self.rejected = 0
+        self._changed: Optional[asyncio.Condition] = None
+        self._health_task: Optional[asyncio.Task] = None
+        slots = parallel * len(self.nodes)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=slots, max_keepalive_connections=slots),
+            timeout=httpx.Timeout(timeout, pool=None)
+        )
+        # Separate connections, so health checks never queue behind translations
+        self._health_client = httpx.AsyncClient(timeout=LLAMACPP_HEALTH_TIMEOUT)
+
+    def _start(self) -> None:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+            self._health_task = asyncio.create_task(self._check_health())
+
+    def _choose(self) -> Optional[LlamaCppNode]:
+        candidates = [node for node in self.nodes if node.available and node.outstanding < node.parallel]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda node: (node.outstanding, node.latency or 0.0))
+
+    async def _acquire(self) -> LlamaCppNode:
+        async with self._changed:
+            while (node := self._choose()) is None:
+                if not any(node.available for node in self.nodes):
+                    self.rejected += 1
+                    # The other waiters would not get a slot either
+                    self._changed.notify_all()
+                    raise CircuitOpenError("No llama.cpp server is available")
+                await self._changed.wait()
+            node.outstanding += 1
+            return node
+
+    async def _release(self, node: LlamaCppNode) -> None:
+        node.outstanding -= 1
+        async with self._changed:
+            self._changed.notify()
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[Tuple[httpx.AsyncClient, str]]:
+        """
+        Wait for a free slot on the least busy server
+
+        Yields:
+            (client, server base URL) to make one request with
+
+        Raises:
+            CircuitOpenError: If no server is available
+        """
+        self._start()
+        node = await self._acquire()
+        started = time.monotonic()
+        try:
+            async with node.breaker.guard():
+                yield self._client, node.url
+            node.record_latency(time.monotonic() - started)
+        except Exception as e:
+            node.errors += 1
+            if isinstance(e, httpx.ConnectError):
+                # Do not send more requests until a health check passes
+                node.healthy = False
+            raise
+        finally:
+            node.requests += 1
+            await self._release(node)
+
+    def has_available(self) -> bool:
+        return any(node.available for node in self.nodes)
+
+    async def _check_health(self) -> None:
+        while True:
+            await asyncio.gather(*(self._check_node(node) for node in self.nodes))
+            await asyncio.sleep(LLAMACPP_HEALTH_INTERVAL)
+
+    async def _check_node(self, node: LlamaCppNode) -> None:
+        try:
+            # llama-server answers 503 while it is still loading the model
+            healthy = (await self._health_client.get(f"{node.url}/health")).status_code == 200
+        except httpx.HTTPError:
+            healthy = False
+        if healthy and not node.healthy:
+            node.healthy = True
+            async with self._changed:
+                self._changed.notify_all()
+        node.healthy = healthy
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await self._client.aclose()
+        await self._health_client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        nodes = [node.stats() for node in self.nodes]
+        return {
+            "state": "closed" if self.has_available() else "open",
+            "failures": sum(node.breaker.failures for node in self.nodes),
+            "rejected": self.rejected + sum(node.breaker.rejected for node in self.nodes),
+            "in_flight": sum(node["in_flight"] for node in nodes),
+            "max_concurrency": sum(node.parallel for node in self.nodes),
+            "nodes": nodes
+        }
+
+
+class SentenceJoiner:
+    """
+    Separates translated sentences the way their source sentences were
+
+    Translations are separated by a space, or by as many line breaks as
+    the source had between the sentences. Call begin() and end() around
+    every source piece and separator() before a translation's first text.
+    """
+
+    def __init__(self):
+        self._gap = ""  # Source whitespace since the last translated sentence
+        self._started = False
+
+    def begin(self, piece: str) -> None:
+        self._gap += piece[:len(piece) - len(piece.lstrip())] if piece.strip() else piece
+
+    def separator(self) -> str:
+        separator = ("\n" * self._gap.count("\n") or " ") if self._started else ""
+        self._gap = ""
+        self._started = True
+        return separator
+
+    def end(self, piece: str) -> None:
+        if piece.strip():
+            self._gap += piece[len(piece.rstrip()):]
+
+
+def join_sentences(pieces: List[str], translations: List[str]) -> str:
+    """
+    Join translated sentences, keeping the line breaks between the originals
+
+    Args:
+        pieces: Source pieces from split_sentences (whitespace included)
+        translations: Translation of each piece
+
+    Returns:
+        Sentences separated by a space, or by the original line breaks
+    """
+    joiner = SentenceJoiner()
+    parts = []
+    for piece, translation in zip(pieces, translations):
+        joiner.begin(piece)
+        if translation:
+            parts.append(joiner.separator())
+            parts.append(translation)
+        joiner.end(piece)
+    return "".join(parts)
 
 
 class NullTranslator:
     """Translator that returns None (no translation)"""
 
-    def translate(self, text: str, source: str = "ja", target: str = "en") -> TranslateResponse:
+    method = "none"
+    model = ""
+
+    async def translate(self, text: str, source: str = "ja", target: str = "en") -> TranslateResponse:
         return TranslateResponse(
             original=text,
             translation=None,
             method="none"
         )
 
+    async def aclose(self) -> None:
+        pass
+
 
 class DeepLTranslator:
     """Translator using DeepL API"""
 
+    method = "deepl"
+    model = "api-free"
+    url = "https://api-free.deepl.com/v2/translate"
+
     def __init__(self, api_key: str):
         self.api_key = api_key
         if not api_key:
             raise ValueError("DeepL API key is required")
+        self.backend = BackendClient("DeepL", DEEPL_MAX_CONCURRENCY, DEEPL_TIMEOUT)
 
-    def translate(self, text: str, source: str = "ja", target: str = "en") -> TranslateResponse:
-        import requests
-
+    async def translate(self, text: str, source: str = "ja", target: str = "en") -> TranslateResponse:
         try:
             # DeepL requires specific target language variants
             target_lang = target.upper()
             if target_lang == "EN":
                 target_lang = "EN-US"
 
-            # Use header-based authentication (new DeepL API requirement)
-            response = requests.post(
-                "https://api-free.deepl.com/v2/translate",
-                headers={
-                    "Authorization": f"DeepL-Auth-Key {self.api_key}"
-                },
-                data={
-                    "text": text,
-                    "source_lang": source.upper(),
-                    "target_lang": target_lang
-                },
-                timeout=10
-            )
-            response.raise_for_status()
-            result = response.json()
-            translation = result["translations"][0]["text"]
+            async with self.backend.request() as client:
+                # Use header-based authentication (new DeepL API requirement)
+                response = await client.post(
+                    self.url,
+                    headers={
+                        "Authorization": f"DeepL-Auth-Key {self.api_key}"
+                    },
+                    data={
+                        "text": text,
+                        "source_lang": source.upper(),
+                        "target_lang": target_lang
+                    }
+                )
+                response.raise_for_status()
+            translation = response.json()["translations"][0]["text"]
 
             return TranslateResponse(
                 original=text,
@@ -55,54 +406,184 @@ class DeepLTranslator:
                 method="deepl"
             )
         except Exception as e:
-            # If translation fails, return None
+            # If translation fails, return error
             return TranslateResponse(
                 original=text,
                 translation=f"Translation error: {str(e)}",
                 method="deepl_error"
             )
 
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
 
 class LlamaCppTranslator:
     """Translator using local llama.cpp server with LFM2-350M-ENJP-MT model"""
 
-    def __init__(self, server_url: str = "http://llamacpp:8080"):
-        self.server_url = server_url
+    method = "llamacpp"
 
-    def translate(self, text: str, source: str = "ja", target: str = "en") -> TranslateResponse:
-        import requests
+    def __init__(self, server_urls: List[str] = LLAMACPP_URLS, model: str = MODEL_FILE):
+        self.model = model
+        # One request per server slot (llama-server --parallel), on the least busy server
+        self.backend = LlamaCppRouter(server_urls, LLAMACPP_PARALLEL, LLAMACPP_TIMEOUT)
 
-        try:
-            # Use chat completions endpoint with system prompt
-            response = requests.post(
-                f"{self.server_url}/v1/chat/completions",
-                json={
-                    "messages": [
-                        {"role": "system", "content": "Translate to English."},
-                        {"role": "user", "content": text}
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 512
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
-            translation = result["choices"][0]["message"]["content"].strip()
+    async def translate(self, text: str, source: str = "ja", target: str = "en") -> TranslateResponse:
+        """
+        Translate sentence by sentence, with concurrent requests to the server
 
-            return TranslateResponse(
-                original=text,
-                translation=translation,
-                method="llamacpp"
-            )
+        Each sentence is a separate chat completion, so long passages are
+        not truncated by max_tokens and take about as long as their longest
+        sentence when enough server slots are free.
+
+        Args:
+            text: Text to translate
+            source: Source language
+            target: Target language
+
+        Returns:
+            TranslateResponse with sentences joined in their original order
+        """
+        pieces = [piece for _, piece in split_sentences(text)]
+        tasks = [asyncio.ensure_future(self._translate_sentence(piece.strip())) for piece in pieces]
+        try:
+            translations = await asyncio.gather(*tasks)
         except Exception as e:
-            # If translation fails, return error
+            # One failed sentence fails the text; free the slots the rest hold
+            for task in tasks:
+                task.cancel()
             return TranslateResponse(
                 original=text,
                 translation=f"Translation error: {str(e)}",
                 method="llamacpp_error"
             )
 
+        return TranslateResponse(
+            original=text,
+            translation=join_sentences(pieces, translations),
+            method="llamacpp"
+        )
+
+    async def translate_stream(self, text: str, source: str = "ja", target: str = "en") -> AsyncIterator[str]:
+        """
+        Translate sentence by sentence, yielding text as it is generated
+
+        All sentences are requested at once (up to the server's slots) and
+        streamed back in order: the first sentence is relayed token by
+        token while later ones are buffered until their turn. Concatenating
+        the chunks gives the same text as translate.
+
+        Closing the iterator early cancels the remaining requests, and the
+        server stops generating for the closed connections.
+
+        Args:
+            text: Text to translate
+            source: Source language
+            target: Target language
+
+        Yields:
+            Chunks of translated text
+
+        Raises:
+            httpx.HTTPError: If a sentence request fails
+            CircuitOpenError: If the server is considered down
+        """
+        pieces = [piece for _, piece in split_sentences(text)]
+        queues = [asyncio.Queue() for _ in pieces]
+        tasks = [
+            asyncio.ensure_future(self._stream_sentence(piece.strip(), queue))
+            for piece, queue in zip(pieces, queues)
+        ]
+        joiner = SentenceJoiner()
+        try:
+            for piece, queue, task in zip(pieces, queues, tasks):
+                joiner.begin(piece)
+                pending = ""  # Whitespace held back until more text follows
+                started = False
+                while (delta := await queue.get()) is not None:
+                    delta = pending + (delta if started else delta.lstrip())
+                    if not delta.strip():
+                        pending = delta
+                        continue
+                    pending = delta[len(delta.rstrip()):]
+                    if not started:
+                        started = True
+                        if separator := joiner.separator():
+                            yield separator
+                    yield delta.rstrip()
+                await task  # Raises the sentence's request error, if any
+                joiner.end(piece)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _translate_sentence(self, sentence: str) -> str:
+        """Translate one sentence, waiting for a free server slot"""
+        if not sentence:
+            return ""
+        while True:
+            try:
+                async with self.backend.request() as (client, url):
+                    response = await client.post(
+                        f"{url}/v1/chat/completions",
+                        json=self._completion_request(sentence)
+                    )
+                    response.raise_for_status()
+                return response.json()["choices"][0]["message"]["content"].strip()
+            except httpx.ConnectError:
+                # Nothing was sent; the server is now out of rotation, so try another
+                if not self.backend.has_available():
+                    raise
+
+    async def _stream_sentence(self, sentence: str, queue: asyncio.Queue) -> None:
+        """Stream one sentence's translation into queue, ending with None"""
+        try:
+            if not sentence:
+                return
+            while True:
+                try:
+                    await self._stream_from_server(sentence, queue)
+                    return
+                except httpx.ConnectError:
+                    # Nothing was received; the server is now out of rotation, so try another
+                    if not self.backend.has_available():
+                        raise
+        finally:
+            queue.put_nowait(None)
+
+    async def _stream_from_server(self, sentence: str, queue: asyncio.Queue) -> None:
+        async with self.backend.request() as (client, url):
+            async with client.stream(
+                "POST",
+                f"{url}/v1/chat/completions",
+                json=self._completion_request(sentence, stream=True)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    # Server-sent events: "data: {chunk}" lines, then "data: [DONE]"
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0]["delta"].get("content")
+                    if delta:
+                        queue.put_nowait(delta)
+
+    @staticmethod
+    def _completion_request(sentence: str, stream: bool = False) -> Dict[str, Any]:
+        return {
+            "messages": [
+                {"role": "system", "content": "Translate to English."},
+                {"role": "user", "content": sentence}
+            ],
+            "temperature": 0.1,
+            "max_tokens": LLAMACPP_MAX_TOKENS,
+            "stream": stream
+        }
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
 
 class TranslatorFactory:
     """Factory for creating appropriate translator based on config"""
@@ -111,8 +592,7 @@ class TranslatorFactory:
     def create():
         """Create translator based on config"""
         if TRANSLATION_METHOD == "llamacpp":
-            llamacpp_url = os.getenv("LLAMACPP_URL", "http://llamacpp:8080")
-            return LlamaCppTranslator(llamacpp_url)
+            return LlamaCppTranslator(LLAMACPP_URLS)
         elif TRANSLATION_METHOD == "deepl" and DEEPL_API_KEY:
             return DeepLTranslator(DEEPL_API_KEY)
         # Default to null translator
@@ -132,8 +612,7 @@ class TranslatorFactory:
         method = method.lower()
 
         if method == "llamacpp":
-            llamacpp_url = os.getenv("LLAMACPP_URL", "http://llamacpp:8080")
-            return LlamaCppTranslator(llamacpp_url)
+            return LlamaCppTranslator(LLAMACPP_URLS)
         elif method == "deepl":
             api_key = DEEPL_API_KEY
             if not api_key:
@@ -144,14 +623,16 @@ class TranslatorFactory:
             return NullTranslator()
 
 
-# Singleton instance
-_translator_instance = None
+# Translators by method, kept so their connection pools are reused
+_translators: Dict[str, Any] = {}
 
 
 def get_translator(method: Optional[str] = None):
     """
     Get translator instance
 
+    Instances are created once per method and shared by all requests.
+
     Args:
         method: Translation method to use (none, deepl, llamacpp)
                 If None, uses the default from config
@@ -159,12 +640,27 @@ def get_translator(method: Optional[str] = None):
     Returns:
         Translator instance
     """
-    if method:
-        # Dynamic translator based on requested method
-        return TranslatorFactory.create_by_method(method)
-
-    # Use singleton for default translator
-    global _translator_instance
-    if _translator_instance is None:
-        _translator_instance = TranslatorFactory.create()
-    return _translator_instance
+    method = (method or TRANSLATION_METHOD).lower()
+    if method not in ("deepl", "llamacpp"):
+        method = "none"
+    translator = _translators.get(method)
+    if translator is None:
+        translator = _translators.setdefault(method, TranslatorFactory.create_by_method(method))
+    return translator
+
+
+def get_translator_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection and circuit breaker state of each backend in use"""
+    return {
+        translator.method: translator.backend.stats()
+        for translator in _translators.values()
+        if hasattr(translator, "backend")
+    }
+
+
+async def close_translators() -> None:
+    """Close pooled connections (called on application shutdown)"""
+    translators = list(_translators.values())
+    _translators.clear()
+    for translator in translators:
+        await translator.aclose()
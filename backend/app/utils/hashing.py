@@ -0,0 +1,8 @@
+import hashlib
+import json
+
+
+def content_hash(data) -> str:
+    """Stable SHA-1 of JSON-serializable data, used to detect changed dictionary entries"""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
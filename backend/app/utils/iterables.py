@@ -0,0 +1,9 @@
+from typing import Iterator, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """Split a sequence into lists of at most size items"""
+    for i in range(0, len(items), size):
+        yield list(items[i:i + size])
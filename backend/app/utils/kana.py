@@ -0,0 +1,107 @@
+from typing import Optional
+
+# Hepburn, Kunrei and common IME spellings
+_ROMAJI = {
+    "a": "あ", "i": "い", "u": "う", "e": "え", "o": "お",
+    "ka": "か", "ki": "き", "ku": "く", "ke": "け", "ko": "こ",
+    "sa": "さ", "si": "し", "shi": "し", "su": "す", "se": "せ", "so": "そ",
+    "ta": "た", "ti": "ち", "chi": "ち", "tu": "つ", "tsu": "つ", "te": "て", "to": "と",
+    "na": "な", "ni": "に", "nu": "ぬ", "ne": "ね", "no": "の",
+    "ha": "は", "hi": "ひ", "hu": "ふ", "fu": "ふ", "he": "へ", "ho": "ほ",
+    "ma": "ま", "mi": "み", "mu": "む", "me": "め", "mo": "も",
+    "ya": "や", "yu": "ゆ", "yo": "よ",
+    "ra": "ら", "ri": "り", "ru": "る", "re": "れ", "ro": "ろ",
+    "wa": "わ", "wi": "ゐ", "we": "ゑ", "wo": "を", "n'": "ん",
+    "ga": "が", "gi": "ぎ", "gu": "ぐ", "ge": "げ", "go": "ご",
+    "za": "ざ", "zi": "じ", "ji": "じ", "zu": "ず", "ze": "ぜ", "zo": "ぞ",
+    "da": "だ", "di": "ぢ", "du": "づ", "de": "で", "do": "ど",
+    "ba": "ば", "bi": "び", "bu": "ぶ", "be": "べ", "bo": "ぼ",
+    "pa": "ぱ", "pi": "ぴ", "pu": "ぷ", "pe": "ぺ", "po": "ぽ",
+    "kya": "きゃ", "kyu": "きゅ", "kyo": "きょ",
+    "sha": "しゃ", "shu": "しゅ", "sho": "しょ", "sya": "しゃ", "syu": "しゅ", "syo": "しょ",
+    "cha": "ちゃ", "chu": "ちゅ", "cho": "ちょ", "tya": "ちゃ", "tyu": "ちゅ", "tyo": "ちょ",
+    "nya": "にゃ", "nyu": "にゅ", "nyo": "にょ",
+    "hya": "ひゃ", "hyu": "ひゅ", "hyo": "ひょ",
+    "mya": "みゃ", "myu": "みゅ", "myo": "みょ",
+    "rya": "りゃ", "ryu": "りゅ", "ryo": "りょ",
+    "gya": "ぎゃ", "gyu": "ぎゅ", "gyo": "ぎょ",
+    "ja": "じゃ", "ju": "じゅ", "jo": "じょ", "zya": "じゃ", "zyu": "じゅ", "zyo": "じょ",
+    "jya": "じゃ", "jyu": "じゅ", "jyo": "じょ",
+    "bya": "びゃ", "byu": "びゅ", "byo": "びょ",
+    "pya": "ぴゃ", "pyu": "ぴゅ", "pyo": "ぴょ",
+    "fa": "ふぁ", "fi": "ふぃ", "fe": "ふぇ", "fo": "ふぉ",
+    "she": "しぇ", "je": "じぇ", "che": "ちぇ", "thi": "てぃ", "dhi": "でぃ",
+    "va": "ゔぁ", "vi": "ゔぃ", "vu": "ゔ", "ve": "ゔぇ", "vo": "ゔぉ",
+    "xa": "ぁ", "xi": "ぃ", "xu": "ぅ", "xe": "ぇ", "xo": "ぉ",
+    "xya": "ゃ", "xyu": "ゅ", "xyo": "ょ", "xtu": "っ", "xtsu": "っ",
+    "-": "ー",
+}
+_MAX_ROMAJI = max(len(key) for key in _ROMAJI)
+_CONSONANTS = set("bcdfghjklmnpqrstvwxyz")
+
+# Katakana (U+30A1-U+30F6) sits 0x60 code points above hiragana
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+
+
+def hiragana_to_katakana(text: str) -> str:
+    """Convert hiragana to katakana"""
+    return text.translate(_HIRAGANA_TO_KATAKANA)
+
+
+def romaji_to_hiragana(text: str) -> Optional[str]:
+    """
+    Convert romaji to hiragana
+
+    Args:
+        text: Romanized Japanese (e.g. "taberu", "kyou", "gakkou")
+
+    Returns:
+        Hiragana, or None if the text is not valid romaji. A trailing "n"
+        becomes ん so partially typed queries still resolve.
+    """
+    text = text.lower()
+    result = []
+    i = 0
+
+    while i < len(text):
+        char = text[i]
+        following = text[i + 1] if i + 1 < len(text) else ""
+
+        # Doubled consonant (except n) -> small tsu
+        if char in _CONSONANTS and char != "n" and following == char:
+            result.append("っ")
+            i += 1
+            continue
+
+        # "nn" -> ん; a following vowel starts the next syllable ("onna")
+        if char == "n" and following == "n":
+            after = text[i + 2] if i + 2 < len(text) else ""
+            result.append("ん")
+            i += 1 if after and after in "aiueoy" else 2
+            continue
+
+        # n before a consonant or at the end, m before b/m/p -> ん
+        if (char == "n" and (not following or (following in _CONSONANTS and following not in "ny"))) \
+                or (char == "m" and following and following in "bmp"):
+            result.append("ん")
+            i += 1
+            continue
+
+        for length in range(min(_MAX_ROMAJI, len(text) - i), 0, -1):
+            kana = _ROMAJI.get(text[i:i + length])
+            if kana:
+                result.append(kana)
+                i += length
+                break
+        else:
+            return None
+
+    return "".join(result)
+
+
+_KATAKANA_TO_HIRAGANA = {code + 0x60: code for code in range(0x3041, 0x3097)}
+
+
+def katakana_to_hiragana(text: str) -> str:
+    """Convert katakana to hiragana"""
+    return text.translate(_KATAKANA_TO_HIRAGANA)
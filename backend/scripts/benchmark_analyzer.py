@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare the Token-based and columnar analysis paths
+
+Tokenizes a generated document with both TextAnalyzer.analyze and
+TextAnalyzer.analyze_columnar and serializes each result to JSON the way
+/api/analyze and /api/analyze/columnar do.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.schemas import AnalyzeResponse
+from app.services.analyzer import TextAnalyzer
+
+SAMPLE = (
+    "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。"
+    "何でも薄暗いじめじめした所でニャーニャー泣いていた事だけは記憶している。"
+    "今日は良い天気ですね、東京タワーに行ってみませんか？"
+)
+
+
+def best_of(repeat: int, fn):
+    """Run fn repeat times and return (fastest seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark(copies: int, repeat: int):
+    analyzer = TextAnalyzer()
+    text = SAMPLE * copies
+    print(f"Document: {len(text)} characters")
+
+    tagger_time, nodes = best_of(repeat, lambda: len(analyzer.tagger(text)))
+    token_time, token_json = best_of(
+        repeat, lambda: AnalyzeResponse(tokens=analyzer.analyze(text)).model_dump_json()
+    )
+    columnar_time, columnar_json = best_of(
+        repeat, lambda: json.dumps(analyzer.analyze_columnar(text).to_dict(), ensure_ascii=False)
+    )
+
+    print(f"  MeCab only:       {tagger_time * 1000:8.1f} ms ({nodes / tagger_time:,.0f} tokens/s)")
+    print(f"  Token models:     {token_time * 1000:8.1f} ms ({nodes / token_time:,.0f} tokens/s, "
+          f"{len(token_json.encode()) / 1024:.0f} KB JSON)")
+    print(f"  Columnar:         {columnar_time * 1000:8.1f} ms ({nodes / columnar_time:,.0f} tokens/s, "
+          f"{len(columnar_json.encode()) / 1024:.0f} KB JSON)")
+    print(f"✓ Columnar is {token_time / columnar_time:.1f}x faster than Token models")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Token vs columnar analysis output")
+    parser.add_argument("--copies", type=int, default=200, help="Times the sample text is repeated (default: 200)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the fastest is reported (default: 5)")
+    args = parser.parse_args()
+    benchmark(args.copies, args.repeat)
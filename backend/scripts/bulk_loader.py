@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Fast bulk-load path shared by the dictionary importers
+"""
+
+from pathlib import Path
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Table, func, select
+from sqlalchemy.engine import Connection
+from app.database import engine
+
+# Connection settings used while loading; durability does not matter because
+# a failed import is simply rerun
+IMPORT_PRAGMAS = {
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    "cache_size": "-262144",  # 256 MB
+    "temp_store": "MEMORY",
+}
+
+# Settings restored once the load has finished
+DEFAULT_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+}
+
+
+class IdAllocator:
+    """Hands out primary keys so parent and child rows can be inserted without reading ids back"""
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self._next_ids: Dict[str, int] = {}
+
+    def take(self, table: Table, count: int) -> range:
+        """Reserve count consecutive primary keys for table"""
+        if table.name not in self._next_ids:
+            max_id = self.connection.execute(select(func.max(table.c.id))).scalar()
+            self._next_ids[table.name] = (max_id or 0) + 1
+        start = self._next_ids[table.name]
+        self._next_ids[table.name] = start + count
+        return range(start, start + count)
+
+
+class BulkLoader:
+    """
+    Bulk insert rows with Core executemany statements in one transaction
+
+    Secondary indexes of the given tables are dropped for the duration of
+    the load and rebuilt afterwards, which is much faster than maintaining
+    them row by row. Primary keys are assigned up front so parent and child
+    rows can be inserted without reading generated ids back.
+
+    Usage:
+        with BulkLoader([Word.__table__, WordMeaning.__table__]) as loader:
+            ids = loader.next_ids(Word.__table__, len(rows))
+            loader.insert(Word.__table__, rows)
+        loader.report()
+    """
+
+    def __init__(self, tables: List[Table]):
+        self.tables = tables
+        self.indexes = [index for table in tables for index in table.indexes]
+        self.timings: Dict[str, float] = {}
+        self.row_counts: Dict[str, int] = {table.name: 0 for table in tables}
+
+    def __enter__(self) -> "BulkLoader":
+        self._started = time.perf_counter()
+        self.connection = engine.connect()
+
+        for name, value in IMPORT_PRAGMAS.items():
+            self.connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+        self.connection.commit()
+
+        started = time.perf_counter()
+        with self.connection.begin():
+            for index in self.indexes:
+                index.drop(self.connection, checkfirst=True)
+        self.timings["drop indexes"] = time.perf_counter() - started
+
+        self._load_started = time.perf_counter()
+        self.transaction = self.connection.begin()
+        self._ids = IdAllocator(self.connection)
+        return self
+
+    def next_ids(self, table: Table, count: int) -> range:
+        """Reserve count consecutive primary keys for table"""
+        return self._ids.take(table, count)
+
+    def insert(self, table: Table, rows: List[dict]):
+        """Insert rows with a single executemany"""
+        if rows:
+            self.connection.execute(table.insert(), rows)
+            self.row_counts[table.name] += len(rows)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.transaction.commit()
+            else:
+                self.transaction.rollback()
+            self.timings["load"] = time.perf_counter() - self._load_started
+
+            # Rebuild indexes even after a failure so the schema stays intact
+            started = time.perf_counter()
+            with self.connection.begin():
+                for index in self.indexes:
+                    index.create(self.connection, checkfirst=True)
+            self.timings["create indexes"] = time.perf_counter() - started
+
+            for name, value in DEFAULT_PRAGMAS.items():
+                self.connection.exec_driver_sql(f"PRAGMA {name} = {value}")
+            self.connection.commit()
+        finally:
+            self.connection.close()
+            self.timings["total"] = time.perf_counter() - self._started
+        return False
+
+    def report(self):
+        """Print row counts and per-phase timings"""
+        rows = ", ".join(f"{count} {name}" for name, count in self.row_counts.items())
+        print(f"  Bulk load: {rows}")
+        for phase, seconds in self.timings.items():
+            print(f"    {phase:<15} {seconds:8.2f}s")
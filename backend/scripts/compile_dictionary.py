@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Compile the imported JMdict data into a read-only memory-mapped file
+
+Run after import_jmdict.py and start the server with DICTIONARY_BACKEND=mmap
+to serve word lookups from the compiled file instead of SQLite.
+"""
+
+import argparse
+from collections import defaultdict
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import DICTIONARY_BIN_PATH
+from app.database import SessionLocal
+from app.models import Word, WordForm, WordMeaning
+from app.services.dictionary_binary import BinaryEntry, write_binary_dictionary
+
+
+def iter_entries(db, batch_size: int = 5000):
+    """Yield BinaryEntry objects in Word.id order, batch by batch"""
+    last_id = 0
+    while True:
+        words = (
+            db.query(Word.id, Word.word, Word.reading, Word.is_common, Word.jlpt_level, Word.frequency)
+            .filter(Word.id > last_id)
+            .order_by(Word.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not words:
+            return
+
+        meanings = defaultdict(lambda: defaultdict(list))
+        for word_id, pos, gloss in (
+            db.query(WordMeaning.word_id, WordMeaning.pos, WordMeaning.gloss)
+            .filter(WordMeaning.word_id.between(words[0].id, words[-1].id))
+            .order_by(WordMeaning.id)
+        ):
+            meanings[word_id][pos].append(gloss)
+
+        forms = defaultdict(list)
+        for word_id, form, priority in (
+            db.query(WordForm.word_id, WordForm.form, WordForm.priority)
+            .filter(WordForm.word_id.between(words[0].id, words[-1].id))
+            .order_by(WordForm.id)
+        ):
+            forms[word_id].append((form, priority))
+
+        for row in words:
+            yield BinaryEntry(
+                word=row.word,
+                reading=row.reading,
+                is_common=bool(row.is_common),
+                jlpt_level=row.jlpt_level,
+                frequency=row.frequency,
+                meanings=list(meanings[row.id].items()),
+                forms=forms[row.id]
+            )
+
+        last_id = words[-1].id
+
+
+def compile_dictionary(output: Path = Path(DICTIONARY_BIN_PATH)):
+    """Compile words and meanings from the database into output"""
+    db = SessionLocal()
+
+    try:
+        print(f"  Compiling dictionary to {output}...")
+        started = time.perf_counter()
+        entry_count, key_count = write_binary_dictionary(iter_entries(db), output)
+        elapsed = time.perf_counter() - started
+
+        size_mb = output.stat().st_size / 1024 / 1024
+        print(f"✓ Compiled {entry_count} entries ({key_count} keys, {size_mb:.1f} MB) in {elapsed:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile JMdict into a memory-mapped binary file")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(DICTIONARY_BIN_PATH),
+        help=f"Output file (default: {DICTIONARY_BIN_PATH})"
+    )
+    args = parser.parse_args()
+    compile_dictionary(args.output)
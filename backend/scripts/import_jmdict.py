@@ -3,20 +3,253 @@
 Import JMdict dictionary data into SQLite database
 """
 
+import argparse
 import gzip
+import queue
+import threading
 import xml.etree.ElementTree as ET
 from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
 import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from app.config import JMDICT_PATH, DATABASE_PATH
-from app.database import SessionLocal
-from app.models import Word, WordMeaning
+from app.database import SessionLocal, bump_data_version, rebuild_search_index
+from app.models import Word, WordForm, WordMeaning
+from app.utils.hashing import content_hash
+from bulk_loader import BulkLoader
 
 
-def import_jmdict():
-    """Import JMdict XML data into database"""
+# Size of decompressed chunks fed to the XML parser
+CHUNK_SIZE = 1 << 20
+
+# Priority markers that flag a common word
+COMMON_PRIORITIES = ['news1', 'ichi1', 'spec1', 'gai1']
+
+
+def form_priority(priorities: List[str], form_type: str) -> int:
+    """
+    Rank a kanji or reading form by its ke_pri/re_pri markers (lower is better)
+
+    nfXX frequency bands rank first, then the other common markers, then
+    the remaining priority markers, then unmarked forms. Kanji forms rank
+    before readings with the same commonness.
+    """
+    rank = 100
+    for tag in priorities:
+        if tag.startswith('nf') and tag[2:].isdigit():
+            rank = min(rank, int(tag[2:]))
+        elif tag in COMMON_PRIORITIES:
+            rank = min(rank, 50)
+        else:
+            rank = min(rank, 70)
+    return rank * 2 + (0 if form_type == 'kanji' else 1)
+
+
+class GzipChunkReader(threading.Thread):
+    """
+    Decompress a gzip file in a background thread
+
+    zlib releases the GIL while inflating, so decompression overlaps with
+    XML parsing on the main thread. The bounded queue keeps at most a few
+    chunks in memory.
+    """
+
+    def __init__(self, path: Path, max_chunks: int = 8):
+        super().__init__(daemon=True)
+        self.path = path
+        self.chunks = queue.Queue(maxsize=max_chunks)
+
+    def run(self):
+        try:
+            with open(self.path, 'rb') as raw, gzip.GzipFile(fileobj=raw) as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    # Report progress in compressed bytes, which we know the total of
+                    self.chunks.put((chunk, raw.tell()))
+            self.chunks.put(None)
+        except Exception as e:
+            self.chunks.put(e)
+
+    def __iter__(self) -> Iterator[Tuple[bytes, int]]:
+        while True:
+            item = self.chunks.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+def iter_jmdict_entries(path: Path) -> Iterator[Tuple[ET.Element, int]]:
+    """
+    Incrementally parse JMdict, yielding one <entry> element at a time
+
+    Each element is cleared once the caller has processed it, so memory
+    stays flat regardless of dictionary size.
+
+    Args:
+        path: Path to gzipped JMdict XML
+
+    Yields:
+        (entry element, compressed bytes read so far)
+    """
+    reader = GzipChunkReader(path)
+    reader.start()
+
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+
+    for chunk, bytes_read in reader:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = elem
+            elif elem.tag == 'entry':
+                yield elem, bytes_read
+                # Drop the processed entry (and its empty shell under the root)
+                elem.clear()
+                root.clear()
+
+    parser.close()
+
+
+def parse_entry(entry: ET.Element) -> Optional[dict]:
+    """
+    Convert a JMdict <entry> element to a plain record
+
+    Returns:
+        {"word": Word columns, "meanings": [WordMeaning columns, ...],
+         "forms": [WordForm columns, ...]}, or None if the entry is incomplete
+    """
+    # Extract entry ID
+    ent_seq = entry.find('ent_seq')
+    if ent_seq is None:
+        return None
+
+    entry_id = int(ent_seq.text)
+
+    # Extract kanji writings
+    k_ele = entry.find('k_ele')
+    kanji_word = k_ele.find('keb').text if k_ele is not None else None
+
+    # Extract reading (kana)
+    r_ele = entry.find('r_ele')
+    if r_ele is None:
+        return None
+
+    reading = r_ele.find('reb').text
+
+    # Use kanji if available, otherwise use reading
+    word_text = kanji_word if kanji_word else reading
+
+    # Check if common word (has news1/ichi1/spec1 priority)
+    is_common = False
+    if k_ele is not None:
+        ke_pri = k_ele.findall('ke_pri')
+        is_common = any(p.text in COMMON_PRIORITIES for p in ke_pri)
+    if not is_common and r_ele is not None:
+        re_pri = r_ele.findall('re_pri')
+        is_common = any(p.text in COMMON_PRIORITIES for p in re_pri)
+
+    # Collect every spelling and reading for lookups
+    forms = []
+    for element, text_tag, pri_tag, form_type in (
+        ('k_ele', 'keb', 'ke_pri', 'kanji'),
+        ('r_ele', 'reb', 're_pri', 'reading')
+    ):
+        for form_ele in entry.findall(element):
+            form_text = form_ele.find(text_tag).text
+            priorities = [p.text for p in form_ele.findall(pri_tag)]
+            forms.append({
+                "form": form_text,
+                "form_type": form_type,
+                "priority": form_priority(priorities, form_type)
+            })
+
+    word = {
+        "word_id": entry_id,
+        "word": word_text,
+        "reading": reading,
+        "is_common": is_common,
+        "jlpt_level": None,
+        "frequency": None
+    }
+
+    # Extract senses (meanings)
+    meanings = []
+    for sense_idx, sense in enumerate(entry.findall('sense'), 1):
+        # Get parts of speech; all are kept, since conjugation types such as
+        # suru verb are often listed after the noun POS
+        pos_list = [
+            # Simplify POS
+            pos.text.replace('&', '').replace(';', '').split('-')[0].strip()
+            for pos in sense.findall('pos')
+        ]
+        pos = "; ".join(pos_list) if pos_list else "unknown"
+
+        # Get glosses (definitions)
+        glosses = sense.findall('gloss')
+        for gloss in glosses:
+            if gloss.text:
+                meanings.append({
+                    "pos": pos,
+                    "gloss": gloss.text,
+                    "sense_order": sense_idx
+                })
+
+    word["content_hash"] = content_hash({"word": word, "meanings": meanings, "forms": forms})
+    return {"word": word, "meanings": meanings, "forms": forms}
+
+
+def write_orm(db, records: List[dict]):
+    """Write a batch of records through the ORM"""
+    db.add_all([
+        Word(
+            **record["word"],
+            meanings=[WordMeaning(**m) for m in record["meanings"]],
+            forms=[WordForm(**f) for f in record["forms"]]
+        )
+        for record in records
+    ])
+    db.commit()
+
+
+def write_bulk(loader: BulkLoader, records: List[dict]):
+    """Write a batch of records with executemany and precomputed ids"""
+    words_table = Word.__table__
+    meanings_table = WordMeaning.__table__
+    forms_table = WordForm.__table__
+
+    word_rows = []
+    meaning_rows = []
+    form_rows = []
+    for record, word_pk in zip(records, loader.next_ids(words_table, len(records))):
+        word_rows.append({"id": word_pk, **record["word"]})
+        meaning_rows.extend({"word_id": word_pk, **m} for m in record["meanings"])
+        form_rows.extend({"word_id": word_pk, **f} for f in record["forms"])
+
+    for rows, table in ((meaning_rows, meanings_table), (form_rows, forms_table)):
+        for row, pk in zip(rows, loader.next_ids(table, len(rows))):
+            row["id"] = pk
+
+    loader.insert(words_table, word_rows)
+    loader.insert(meanings_table, meaning_rows)
+    loader.insert(forms_table, form_rows)
+
+
+def import_jmdict(fast: bool = False):
+    """
+    Import JMdict XML data into database
+
+    Args:
+        fast: Use bulk Core inserts with import-time pragmas and deferred
+              index creation instead of the ORM
+    """
     if not JMDICT_PATH.exists():
         raise FileNotFoundError(f"JMdict file not found: {JMDICT_PATH}")
 
@@ -31,94 +264,18 @@ def import_jmdict():
 
         print(f"  Parsing {JMDICT_PATH}...")
 
-        # Parse XML (it's gzipped)
-        with gzip.open(JMDICT_PATH, 'rb') as f:
-            tree = ET.parse(f)
-            root = tree.getroot()
-
-        entries = root.findall('entry')
-        total = len(entries)
-        print(f"  Found {total} entries")
-
-        batch_size = 1000
-        batch = []
-
-        for idx, entry in enumerate(entries, 1):
-            # Extract entry ID
-            ent_seq = entry.find('ent_seq')
-            if ent_seq is None:
-                continue
-
-            entry_id = int(ent_seq.text)
-
-            # Extract kanji writings
-            k_ele = entry.find('k_ele')
-            kanji_word = k_ele.find('keb').text if k_ele is not None else None
-
-            # Extract reading (kana)
-            r_ele = entry.find('r_ele')
-            if r_ele is None:
-                continue
-
-            reading = r_ele.find('reb').text
-
-            # Use kanji if available, otherwise use reading
-            word_text = kanji_word if kanji_word else reading
-
-            # Check if common word (has news1/ichi1/spec1 priority)
-            is_common = False
-            if k_ele is not None:
-                ke_pri = k_ele.findall('ke_pri')
-                is_common = any(p.text in ['news1', 'ichi1', 'spec1', 'gai1'] for p in ke_pri)
-            if not is_common and r_ele is not None:
-                re_pri = r_ele.findall('re_pri')
-                is_common = any(p.text in ['news1', 'ichi1', 'spec1', 'gai1'] for p in re_pri)
-
-            # Create Word object
-            word = Word(
-                word_id=entry_id,
-                word=word_text,
-                reading=reading,
-                is_common=is_common
-            )
-
-            # Extract senses (meanings)
-            meanings = []
-            for sense_idx, sense in enumerate(entry.findall('sense'), 1):
-                # Get part of speech
-                pos_list = sense.findall('pos')
-                pos = pos_list[0].text if pos_list else "unknown"
-                # Simplify POS
-                pos = pos.replace('&', '').replace(';', '').split('-')[0]
-
-                # Get glosses (definitions)
-                glosses = sense.findall('gloss')
-                for gloss in glosses:
-                    if gloss.text:
-                        meaning = WordMeaning(
-                            pos=pos,
-                            gloss=gloss.text,
-                            sense_order=sense_idx
-                        )
-                        meanings.append(meaning)
-
-            # Add meanings to word
-            word.meanings = meanings
-
-            # Add to batch
-            batch.append(word)
-
-            # Commit batch
-            if len(batch) >= batch_size:
-                db.add_all(batch)
-                db.commit()
-                print(f"  Imported {idx}/{total} entries ({idx*100//total}%)")
-                batch = []
-
-        # Commit remaining
-        if batch:
-            db.add_all(batch)
-            db.commit()
+        if fast:
+            with BulkLoader([Word.__table__, WordMeaning.__table__, WordForm.__table__]) as loader:
+                _import_entries(lambda batch: write_bulk(loader, batch))
+            loader.report()
+        else:
+            _import_entries(lambda batch: write_orm(db, batch))
+
+        print("  Building gloss search index...")
+        rebuild_search_index()
+
+        # Let running servers know their cached lookups are stale
+        bump_data_version()
 
         final_count = db.query(Word).count()
         print(f"✓ Imported {final_count} words from JMdict")
@@ -130,5 +287,35 @@ def import_jmdict():
         db.close()
 
 
+def _import_entries(write_batch: Callable[[List[dict]], None], batch_size: int = 1000):
+    """Parse JMdict and hand records to write_batch in batches"""
+    total_bytes = JMDICT_PATH.stat().st_size
+    batch = []
+    count = 0
+
+    for entry, bytes_read in iter_jmdict_entries(JMDICT_PATH):
+        record = parse_entry(entry)
+        if record is None:
+            continue
+
+        # Add to batch
+        batch.append(record)
+        count += 1
+
+        # Commit batch
+        if len(batch) >= batch_size:
+            write_batch(batch)
+            print(f"  Imported {count} entries, "
+                  f"{bytes_read // 1024}/{total_bytes // 1024} KB read ({bytes_read * 100 // total_bytes}%)")
+            batch = []
+
+    # Commit remaining
+    if batch:
+        write_batch(batch)
+
+
 if __name__ == "__main__":
-    import_jmdict()
+    parser = argparse.ArgumentParser(description="Import JMdict into the database")
+    parser.add_argument("--fast", action="store_true", help="Use the bulk insert path")
+    args = parser.parse_args()
+    import_jmdict(fast=args.fast)
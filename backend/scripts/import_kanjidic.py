@@ -3,19 +3,151 @@
 Import KANJIDIC2 dictionary data into SQLite database
 """
 
+import argparse
 import xml.etree.ElementTree as ET
 from pathlib import Path
+from typing import Callable, List, Optional
 import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from app.config import KANJIDIC_PATH
-from app.database import SessionLocal
+from app.database import SessionLocal, bump_data_version
 from app.models import Kanji, KanjiReading, KanjiMeaning
-
-
-def import_kanjidic():
-    """Import KANJIDIC2 XML data into database"""
+from app.utils.hashing import content_hash
+from bulk_loader import BulkLoader
+
+
+def parse_character(char_elem: ET.Element) -> Optional[dict]:
+    """
+    Convert a KANJIDIC2 <character> element to a plain record
+
+    Returns:
+        {"kanji": Kanji columns, "readings": [...], "meanings": [...]},
+        or None if the element has no literal
+    """
+    # Extract literal character
+    literal = char_elem.find('literal')
+    if literal is None:
+        return None
+
+    character = literal.text
+
+    # Extract stroke count
+    misc = char_elem.find('misc')
+    stroke_count = None
+    grade = None
+    freq = None
+    jlpt = None
+
+    if misc is not None:
+        sc = misc.find('stroke_count')
+        if sc is not None:
+            stroke_count = int(sc.text)
+
+        gr = misc.find('grade')
+        if gr is not None:
+            grade = int(gr.text)
+
+        fr = misc.find('freq')
+        if fr is not None:
+            freq = int(fr.text)
+
+        jl = misc.find('jlpt')
+        if jl is not None:
+            jlpt = int(jl.text)
+
+    # Extract radical
+    rad_elem = char_elem.find('.//radical/rad_value[@rad_type="classical"]')
+    radical = rad_elem.text if rad_elem is not None else None
+
+    kanji = {
+        "character": character,
+        "radical": radical,
+        "stroke_count": stroke_count,
+        "grade": grade,
+        "jlpt_level": jlpt,
+        "frequency": freq
+    }
+
+    # Extract readings
+    readings = []
+    reading_meaning = char_elem.find('reading_meaning')
+    if reading_meaning is not None:
+        rmgroup = reading_meaning.find('rmgroup')
+        if rmgroup is not None:
+            for reading_elem in rmgroup.findall('reading'):
+                r_type = reading_elem.get('r_type')
+                reading_text = reading_elem.text
+
+                if r_type == 'ja_on':
+                    readings.append({"reading_type": 'on', "reading": reading_text})
+                elif r_type == 'ja_kun':
+                    readings.append({"reading_type": 'kun', "reading": reading_text})
+                elif r_type == 'nanori':
+                    readings.append({"reading_type": 'nanori', "reading": reading_text})
+
+    # Extract meanings
+    meanings = []
+    if reading_meaning is not None:
+        rmgroup = reading_meaning.find('rmgroup')
+        if rmgroup is not None:
+            for meaning_idx, meaning_elem in enumerate(rmgroup.findall('meaning'), 1):
+                # Only English meanings (no m_lang attribute)
+                if meaning_elem.get('m_lang') is None and meaning_elem.text:
+                    meanings.append({
+                        "meaning": meaning_elem.text,
+                        "meaning_order": meaning_idx
+                    })
+
+    kanji["content_hash"] = content_hash({"kanji": kanji, "readings": readings, "meanings": meanings})
+    return {"kanji": kanji, "readings": readings, "meanings": meanings}
+
+
+def write_orm(db, records: List[dict]):
+    """Write a batch of records through the ORM"""
+    db.add_all([
+        Kanji(
+            **record["kanji"],
+            readings=[KanjiReading(**r) for r in record["readings"]],
+            meanings=[KanjiMeaning(**m) for m in record["meanings"]]
+        )
+        for record in records
+    ])
+    db.commit()
+
+
+def write_bulk(loader: BulkLoader, records: List[dict]):
+    """Write a batch of records with executemany and precomputed ids"""
+    kanji_table = Kanji.__table__
+    readings_table = KanjiReading.__table__
+    meanings_table = KanjiMeaning.__table__
+
+    kanji_rows = []
+    reading_rows = []
+    meaning_rows = []
+    for record, kanji_pk in zip(records, loader.next_ids(kanji_table, len(records))):
+        kanji_rows.append({"id": kanji_pk, **record["kanji"]})
+        reading_rows.extend({"kanji_id": kanji_pk, **r} for r in record["readings"])
+        meaning_rows.extend({"kanji_id": kanji_pk, **m} for m in record["meanings"])
+
+    for rows, table in ((reading_rows, readings_table), (meaning_rows, meanings_table)):
+        for row, pk in zip(rows, loader.next_ids(table, len(rows))):
+            row["id"] = pk
+
+    loader.insert(kanji_table, kanji_rows)
+    loader.insert(readings_table, reading_rows)
+    loader.insert(meanings_table, meaning_rows)
+
+
+def import_kanjidic(fast: bool = False):
+    """
+    Import KANJIDIC2 XML data into database
+
+    Args:
+        fast: Use bulk Core inserts with import-time pragmas and deferred
+              index creation instead of the ORM
+    """
     if not KANJIDIC_PATH.exists():
         raise FileNotFoundError(f"KANJIDIC file not found: {KANJIDIC_PATH}")
 
@@ -37,103 +169,16 @@ def import_kanjidic():
         total = len(characters)
         print(f"  Found {total} kanji")
 
-        batch_size = 500
-        batch = []
-
-        for idx, char_elem in enumerate(characters, 1):
-            # Extract literal character
-            literal = char_elem.find('literal')
-            if literal is None:
-                continue
-
-            character = literal.text
-
-            # Extract stroke count
-            misc = char_elem.find('misc')
-            stroke_count = None
-            grade = None
-            freq = None
-            jlpt = None
-
-            if misc is not None:
-                sc = misc.find('stroke_count')
-                if sc is not None:
-                    stroke_count = int(sc.text)
-
-                gr = misc.find('grade')
-                if gr is not None:
-                    grade = int(gr.text)
-
-                fr = misc.find('freq')
-                if fr is not None:
-                    freq = int(fr.text)
-
-                jl = misc.find('jlpt')
-                if jl is not None:
-                    jlpt = int(jl.text)
-
-            # Extract radical
-            rad_elem = char_elem.find('.//radical/rad_value[@rad_type="classical"]')
-            radical = rad_elem.text if rad_elem is not None else None
-
-            # Create Kanji object
-            kanji = Kanji(
-                character=character,
-                radical=radical,
-                stroke_count=stroke_count,
-                grade=grade,
-                jlpt_level=jlpt,
-                frequency=freq
-            )
-
-            # Extract readings
-            readings = []
-            reading_meaning = char_elem.find('reading_meaning')
-            if reading_meaning is not None:
-                rmgroup = reading_meaning.find('rmgroup')
-                if rmgroup is not None:
-                    for reading_elem in rmgroup.findall('reading'):
-                        r_type = reading_elem.get('r_type')
-                        reading_text = reading_elem.text
-
-                        if r_type == 'ja_on':
-                            readings.append(KanjiReading(reading_type='on', reading=reading_text))
-                        elif r_type == 'ja_kun':
-                            readings.append(KanjiReading(reading_type='kun', reading=reading_text))
-                        elif r_type == 'nanori':
-                            readings.append(KanjiReading(reading_type='nanori', reading=reading_text))
-
-            kanji.readings = readings
-
-            # Extract meanings
-            meanings = []
-            if reading_meaning is not None:
-                rmgroup = reading_meaning.find('rmgroup')
-                if rmgroup is not None:
-                    for meaning_idx, meaning_elem in enumerate(rmgroup.findall('meaning'), 1):
-                        # Only English meanings (no m_lang attribute)
-                        if meaning_elem.get('m_lang') is None and meaning_elem.text:
-                            meanings.append(KanjiMeaning(
-                                meaning=meaning_elem.text,
-                                meaning_order=meaning_idx
-                            ))
-
-            kanji.meanings = meanings
-
-            # Add to batch
-            batch.append(kanji)
-
-            # Commit batch
-            if len(batch) >= batch_size:
-                db.add_all(batch)
-                db.commit()
-                print(f"  Imported {idx}/{total} kanji ({idx*100//total}%)")
-                batch = []
-
-        # Commit remaining
-        if batch:
-            db.add_all(batch)
-            db.commit()
+        tables = [Kanji.__table__, KanjiReading.__table__, KanjiMeaning.__table__]
+        if fast:
+            with BulkLoader(tables) as loader:
+                _import_characters(characters, lambda batch: write_bulk(loader, batch))
+            loader.report()
+        else:
+            _import_characters(characters, lambda batch: write_orm(db, batch))
+
+        # Let running servers know their cached lookups are stale
+        bump_data_version()
 
         final_count = db.query(Kanji).count()
         print(f"✓ Imported {final_count} kanji from KANJIDIC")
@@ -145,5 +190,33 @@ def import_kanjidic():
         db.close()
 
 
+def _import_characters(characters: List[ET.Element], write_batch: Callable[[List[dict]], None],
+                       batch_size: int = 500):
+    """Convert <character> elements and hand records to write_batch in batches"""
+    total = len(characters)
+    batch = []
+
+    for idx, char_elem in enumerate(characters, 1):
+        record = parse_character(char_elem)
+        if record is None:
+            continue
+
+        # Add to batch
+        batch.append(record)
+
+        # Commit batch
+        if len(batch) >= batch_size:
+            write_batch(batch)
+            print(f"  Imported {idx}/{total} kanji ({idx*100//total}%)")
+            batch = []
+
+    # Commit remaining
+    if batch:
+        write_batch(batch)
+
+
 if __name__ == "__main__":
-    import_kanjidic()
+    parser = argparse.ArgumentParser(description="Import KANJIDIC2 into the database")
+    parser.add_argument("--fast", action="store_true", help="Use the bulk insert path")
+    args = parser.parse_args()
+    import_kanjidic(fast=args.fast)
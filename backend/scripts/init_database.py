@@ -8,17 +8,21 @@ This script:
 3. Imports JMdict and KANJIDIC data
 """
 
+import argparse
 import sys
 import os
+import time
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from app.config import DB_DIR, DICT_DIR, JMDICT_PATH, KANJIDIC_PATH
+from app.config import DB_DIR, DICT_DIR, JMDICT_PATH, KANJIDIC_PATH, DICTIONARY_BACKEND
 from app.database import init_db, engine
 from import_jmdict import import_jmdict
 from import_kanjidic import import_kanjidic
+from compile_dictionary import compile_dictionary
+from parallel_import import import_parallel
 import urllib.request
 
 
@@ -41,6 +45,21 @@ def download_file(url: str, dest: Path, desc: str):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Initialize the Japanese Analyzer database")
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Import with bulk inserts, import-time pragmas and deferred index creation"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Import JMdict and KANJIDIC concurrently with this many parse processes "
+             "and a single bulk writer (default: 0, serial import)"
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Japanese Text Analyzer - Database Initialization")
     print("=" * 60)
@@ -77,11 +96,21 @@ def main():
     print("✓ Database schema created")
 
     # Import data
-    print("\n4. Importing JMdict...")
-    import_jmdict()
-
-    print("\n5. Importing KANJIDIC...")
-    import_kanjidic()
+    started = time.perf_counter()
+    if args.workers > 0:
+        print("\n4-5. Importing JMdict and KANJIDIC in parallel...")
+        import_parallel(workers=args.workers)
+    else:
+        print("\n4. Importing JMdict...")
+        import_jmdict(fast=args.fast)
+
+        print("\n5. Importing KANJIDIC...")
+        import_kanjidic(fast=args.fast)
+    print(f"\nImport took {time.perf_counter() - started:.1f}s")
+
+    if DICTIONARY_BACKEND == "mmap":
+        print("\n6. Compiling binary dictionary...")
+        compile_dictionary()
 
     print("\n" + "=" * 60)
     print("Database initialization complete!")
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Pipelined multi-process dictionary import
+
+JMdict and KANJIDIC are read concurrently and split into batches of raw XML
+fragments. A process pool parses and transforms the batches, and a single
+writer process bulk-inserts the results from a bounded queue. Batches are
+written in document order, so the resulting database is identical to the
+serial import.
+"""
+
+import argparse
+from collections import deque
+from itertools import islice
+import multiprocessing as mp
+import queue
+import threading
+import time
+import traceback
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Iterator, List, Tuple
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import JMDICT_PATH, KANJIDIC_PATH
+from app.database import SessionLocal, bump_data_version, engine, rebuild_search_index
+from app.models import Word, WordForm, WordMeaning, Kanji, KanjiReading, KanjiMeaning
+from bulk_loader import BulkLoader
+import import_jmdict
+import import_kanjidic
+
+# Raw bytes read per chunk from the dictionary files
+READ_SIZE = 1 << 20
+
+
+class Source:
+    """A dictionary file and how to split and transform it"""
+
+    def __init__(self, name: str, label: str, path: Path, tag: str, root: str, batch_size: int):
+        self.name = name
+        self.label = label
+        self.path = path
+        self.open_tag = f"<{tag}>".encode()
+        self.close_tag = f"</{tag}>".encode()
+        self.root_close = f"</{root}>".encode()
+        self.batch_size = batch_size
+
+    def read_chunks(self) -> Iterator[Tuple[bytes, int]]:
+        """Yield (raw chunk, file bytes read so far)"""
+        if self.path.suffix == ".gz":
+            # Decompression runs in its own thread
+            reader = import_jmdict.GzipChunkReader(self.path)
+            reader.start()
+            yield from reader
+            return
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = f.read(READ_SIZE)
+                if not chunk:
+                    return
+                yield chunk, f.tell()
+
+
+JMDICT = Source("jmdict", "JMdict", JMDICT_PATH, "entry", "JMdict", batch_size=2000)
+KANJIDIC = Source("kanjidic", "KANJIDIC", KANJIDIC_PATH, "character", "kanjidic2", batch_size=1000)
+
+
+def split_batches(source: Source) -> Iterator[Tuple[bytes, bytes, int]]:
+    """
+    Split a dictionary file into batches of complete elements
+
+    The prolog (XML declaration, DOCTYPE with its entity definitions and the
+    root start tag) is returned with every batch so each batch parses as a
+    standalone document.
+
+    Yields:
+        (prolog, batch of raw elements, file bytes read so far)
+    """
+    prolog = None
+    buffer = b""
+
+    for chunk, bytes_read in source.read_chunks():
+        buffer += chunk
+
+        if prolog is None:
+            # Skip past the internal DTD subset before looking for elements
+            dtd_end = buffer.find(b"]>")
+            search_from = dtd_end + 2 if dtd_end != -1 else 0
+            first = buffer.find(source.open_tag, search_from)
+            if first == -1:
+                continue
+            prolog, buffer = buffer[:first], buffer[first:]
+
+        # Cut after the batch_size-th closing tag, as often as possible
+        position = 0
+        count = 0
+        cut = 0
+        while True:
+            found = buffer.find(source.close_tag, position)
+            if found == -1:
+                break
+            position = found + len(source.close_tag)
+            count += 1
+            if count == source.batch_size:
+                yield prolog, buffer[cut:position], bytes_read
+                cut = position
+                count = 0
+        buffer = buffer[cut:]
+
+    # Whatever remains is the final partial batch plus the root end tag
+    end = buffer.rfind(source.close_tag)
+    if prolog is not None and end != -1:
+        yield prolog, buffer[:end + len(source.close_tag)], bytes_read
+
+
+def transform_batch(task: Tuple[str, bytes, bytes]) -> List[dict]:
+    """Parse one batch of raw XML into records (runs in pool workers)"""
+    name, prolog, batch = task
+    source = SOURCES[name]
+    root = ET.fromstring(prolog + batch + source.root_close)
+    if name == "jmdict":
+        records = (import_jmdict.parse_entry(entry) for entry in root.iter("entry"))
+    else:
+        records = (import_kanjidic.parse_character(char) for char in root.iter("character"))
+    return [record for record in records if record is not None]
+
+
+SOURCES = {source.name: source for source in (JMDICT, KANJIDIC)}
+
+WRITERS = {
+    "jmdict": (import_jmdict.write_bulk, [Word.__table__, WordMeaning.__table__, WordForm.__table__]),
+    "kanjidic": (import_kanjidic.write_bulk, [Kanji.__table__, KanjiReading.__table__, KanjiMeaning.__table__]),
+}
+
+
+def writer_main(messages: mp.Queue, names: List[str]):
+    """Single writer process: bulk-insert record batches as they arrive"""
+    # Connections must not be shared with the parent process
+    engine.dispose(close=False)
+
+    tables = [table for name in names for table in WRITERS[name][1]]
+    remaining = set(names)
+    try:
+        with BulkLoader(tables) as loader:
+            while remaining:
+                kind, payload = messages.get()
+                if kind == "done":
+                    remaining.discard(payload)
+                elif kind == "abort":
+                    # Raising inside the loader rolls the whole import back
+                    raise RuntimeError(f"Import of {payload} failed, rolling back")
+                else:
+                    WRITERS[kind][0](loader, payload)
+        loader.report()
+    except Exception:
+        traceback.print_exc()
+        sys.exit(1)
+
+
+def _put(messages: mp.Queue, writer: mp.Process, item):
+    """Put on the writer queue, failing instead of blocking forever if the writer died"""
+    while True:
+        try:
+            messages.put(item, timeout=1)
+            return
+        except queue.Full:
+            if not writer.is_alive():
+                raise RuntimeError("Writer process exited unexpectedly")
+
+
+def produce(source: Source, pool, messages: mp.Queue, writer: mp.Process, max_in_flight: int, errors: list):
+    """
+    Split a source, transform batches in the pool and forward results in order
+
+    Batches are submitted with apply_async rather than imap: the pool hands
+    out imap tasks from one generator at a time, so a second source would
+    wait for the first instead of being parsed alongside it.
+    """
+    try:
+        total_bytes = source.path.stat().st_size
+        batches = split_batches(source)
+        pending = deque()
+        count = 0
+        while True:
+            # Keep max_in_flight batches submitted; results are taken in order
+            for prolog, batch, bytes_read in islice(batches, max_in_flight - len(pending)):
+                task = (source.name, prolog, batch)
+                pending.append((pool.apply_async(transform_batch, (task,)), bytes_read))
+            if not pending:
+                break
+
+            result, bytes_read = pending.popleft()
+            records = result.get()
+            _put(messages, writer, (source.name, records))
+            count += len(records)
+            print(f"  [{source.label}] Imported {count} entries, "
+                  f"{bytes_read // 1024}/{total_bytes // 1024} KB read ({bytes_read * 100 // total_bytes}%)")
+    except Exception as e:
+        errors.append(e)
+        # The writer must not commit a partial import
+        message = ("abort", source.name)
+    else:
+        message = ("done", source.name)
+
+    try:
+        _put(messages, writer, message)
+    except RuntimeError:
+        pass
+
+
+def import_parallel(workers: int = mp.cpu_count(), queue_size: int = 8):
+    """
+    Import JMdict and KANJIDIC concurrently with a parse pool and one writer
+
+    Args:
+        workers: Number of parse/transform processes
+        queue_size: Maximum record batches waiting for the writer
+    """
+    sources = []
+    db = SessionLocal()
+    try:
+        for source, model in ((JMDICT, Word), (KANJIDIC, Kanji)):
+            if not source.path.exists():
+                raise FileNotFoundError(f"{source.label} file not found: {source.path}")
+            existing_count = db.query(model).count()
+            if existing_count > 0:
+                print(f"  Database already has {existing_count} {source.label} entries. Skipping import.")
+            else:
+                sources.append(source)
+    finally:
+        db.close()
+
+    if not sources:
+        return
+
+    started = time.perf_counter()
+    print(f"  Importing {', '.join(s.label for s in sources)} with {workers} workers...")
+
+    messages = mp.Queue(maxsize=queue_size)
+    writer = mp.Process(target=writer_main, args=(messages, [s.name for s in sources]), name="import-writer")
+    writer.start()
+
+    errors = []
+    with mp.Pool(workers) as pool:
+        producers = [
+            threading.Thread(
+                target=produce,
+                args=(source, pool, messages, writer, workers * 2, errors)
+            )
+            for source in sources
+        ]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+
+    writer.join()
+    if writer.exitcode != 0:
+        # Records still queued for the dead writer must not block exit
+        messages.cancel_join_thread()
+    if errors:
+        raise errors[0]
+    if writer.exitcode != 0:
+        raise RuntimeError(f"Writer process failed with exit code {writer.exitcode}")
+
+    if JMDICT in sources:
+        print("  Building gloss search index...")
+        rebuild_search_index()
+
+    # Let running servers know their cached lookups are stale
+    bump_data_version()
+
+    db = SessionLocal()
+    try:
+        print(f"✓ Imported {db.query(Word).count()} words and {db.query(Kanji).count()} kanji "
+              f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import JMdict and KANJIDIC with a parallel pipeline")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=mp.cpu_count(),
+        help="Number of parse/transform processes (default: CPU count)"
+    )
+    args = parser.parse_args()
+    import_parallel(workers=args.workers)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the llama.cpp server, for testing translation without a model
+
+Answers /v1/chat/completions (streaming and non-streaming) with a fake
+translation of the user message after a configurable delay, and /health.
+Requests beyond --parallel wait, like llama-server slots. Point the
+backend at it with LLAMACPP_URL=http://localhost:8080.
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import random
+import threading
+import time
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Set from the command line in main()
+    delay = 0.5
+    failure_rate = 0.0
+    slots = threading.Semaphore(4)
+    stats = {"requests": 0, "failed": 0, "aborted": 0}
+    stats_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.stats)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/v1/chat/completions":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        text = request["messages"][-1]["content"]
+        translation = f"[en] {text}"
+        self._count("requests")
+
+        with self.slots:
+            if random.random() < self.failure_rate:
+                time.sleep(self.delay)
+                self._count("failed")
+                self._send_json(500, {"error": {"message": "stub failure"}})
+                return
+
+            if not request.get("stream"):
+                time.sleep(self.delay)
+                self._send_json(200, {
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": translation}}]
+                })
+                return
+
+            # Server-sent events, one word per chunk, spread over the delay
+            words = translation.split(" ")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            try:
+                for i, word in enumerate(words):
+                    time.sleep(self.delay / len(words))
+                    chunk = {"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # Client went away; llama-server stops generating here too
+                self._count("aborted")
+            self.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub llama.cpp server for translation tests")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds per completion (default: 0.5)")
+    parser.add_argument("--parallel", type=int, default=4, help="Concurrent completions (default: 4)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Fraction of completions answered with HTTP 500 (default: 0)")
+    args = parser.parse_args()
+
+    StubHandler.delay = args.delay
+    StubHandler.failure_rate = args.failure_rate
+    StubHandler.slots = threading.Semaphore(args.parallel)
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub llama.cpp server on http://{args.host}:{args.port} "
+          f"({args.parallel} slots, {args.delay}s per completion)")
+    print("Request counts: GET /stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
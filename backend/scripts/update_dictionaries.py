@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Incrementally refresh an imported database from new dictionary releases
+
+Each parsed entry carries a content hash. Entries are matched to stored rows
+by their natural key (JMdict ent_seq, KANJIDIC character), and only new,
+changed and removed entries are written, all in a single transaction. The
+API keeps serving the previous data until the transaction commits. A
+compiled binary dictionary (DICTIONARY_BACKEND=mmap) is recompiled when
+JMdict changed.
+"""
+
+import argparse
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Table, bindparam, delete, select, update
+from sqlalchemy.engine import Connection
+from app.config import DICTIONARY_BIN_PATH, JMDICT_PATH, KANJIDIC_PATH
+from app.database import bump_data_version, engine, init_db, rebuild_search_index
+from app.models import Word, WordForm, WordMeaning, Kanji, KanjiReading, KanjiMeaning
+from app.utils.iterables import chunked
+from bulk_loader import IdAllocator
+from compile_dictionary import compile_dictionary
+from import_jmdict import iter_jmdict_entries, parse_entry
+from import_kanjidic import parse_character
+
+BATCH_SIZE = 1000
+
+
+class RefreshSpec:
+    """Where a record's parent row and child rows are stored"""
+
+    def __init__(self, label: str, record_key: str, parent: Table, natural_key: str,
+                 foreign_key: str, children: Dict[str, Table]):
+        self.label = label
+        self.record_key = record_key    # record[record_key] holds the parent columns
+        self.parent = parent
+        self.natural_key = natural_key  # stable key across releases
+        self.foreign_key = foreign_key  # child column referencing parent.id
+        self.children = children        # record key -> child table
+
+
+JMDICT_SPEC = RefreshSpec(
+    "JMdict", "word", Word.__table__, "word_id", "word_id",
+    {"meanings": WordMeaning.__table__, "forms": WordForm.__table__}
+)
+KANJIDIC_SPEC = RefreshSpec(
+    "KANJIDIC", "kanji", Kanji.__table__, "character", "kanji_id",
+    {"readings": KanjiReading.__table__, "meanings": KanjiMeaning.__table__}
+)
+
+
+def _delete_children(connection: Connection, spec: RefreshSpec, parent_ids: List[int]):
+    for table in spec.children.values():
+        for chunk in chunked(parent_ids, 500):
+            connection.execute(delete(table).where(table.c[spec.foreign_key].in_(chunk)))
+
+
+def _write_batch(connection: Connection, spec: RefreshSpec, ids: IdAllocator,
+                 inserted: List[dict], changed: List[tuple]):
+    """Insert new records and rewrite changed ones (with all their children)"""
+    parent = spec.parent
+
+    parent_rows = []
+    pairs = []
+    for record, parent_id in zip(inserted, ids.take(parent, len(inserted))):
+        parent_rows.append({"id": parent_id, **record[spec.record_key]})
+        pairs.append((record, parent_id))
+    if parent_rows:
+        connection.execute(parent.insert(), parent_rows)
+
+    if changed:
+        _delete_children(connection, spec, [parent_id for _, parent_id in changed])
+        # Bind names must differ from column names in an UPDATE ... SET
+        columns = list(changed[0][0][spec.record_key])
+        statement = (
+            update(parent)
+            .where(parent.c.id == bindparam("_id"))
+            .values({column: bindparam(f"_{column}") for column in columns})
+        )
+        connection.execute(statement, [
+            {"_id": parent_id, **{f"_{k}": v for k, v in record[spec.record_key].items()}}
+            for record, parent_id in changed
+        ])
+        pairs.extend(changed)
+
+    for record_key, table in spec.children.items():
+        rows = [
+            {spec.foreign_key: parent_id, **child}
+            for record, parent_id in pairs
+            for child in record[record_key]
+        ]
+        for row, child_id in zip(rows, ids.take(table, len(rows))):
+            row["id"] = child_id
+        if rows:
+            connection.execute(table.insert(), rows)
+
+
+def refresh(spec: RefreshSpec, records: Iterable[dict]) -> Counter:
+    """
+    Apply a new dictionary release to the stored data
+
+    Args:
+        spec: Which tables the records belong to
+        records: Parsed records of the complete new release
+
+    Returns:
+        Counts of added, updated, deleted and unchanged entries
+    """
+    counts = Counter()
+    parent = spec.parent
+    key_column = parent.c[spec.natural_key]
+
+    with engine.begin() as connection:
+        stored = {
+            key: (parent_id, stored_hash)
+            for parent_id, key, stored_hash in connection.execute(
+                select(parent.c.id, key_column, parent.c.content_hash)
+            )
+        }
+        ids = IdAllocator(connection)
+        seen = set()
+        inserted: List[dict] = []
+        changed: List[tuple] = []
+
+        for record in records:
+            columns = record[spec.record_key]
+            key = columns[spec.natural_key]
+            if key in seen:
+                continue
+            seen.add(key)
+
+            existing = stored.get(key)
+            if existing is None:
+                inserted.append(record)
+                counts["added"] += 1
+            elif existing[1] != columns["content_hash"]:
+                changed.append((record, existing[0]))
+                counts["updated"] += 1
+            else:
+                counts["unchanged"] += 1
+
+            if len(inserted) + len(changed) >= BATCH_SIZE:
+                _write_batch(connection, spec, ids, inserted, changed)
+                inserted, changed = [], []
+
+        _write_batch(connection, spec, ids, inserted, changed)
+
+        removed = [parent_id for key, (parent_id, _) in stored.items() if key not in seen]
+        if removed:
+            _delete_children(connection, spec, removed)
+            for chunk in chunked(removed, 500):
+                connection.execute(delete(parent).where(parent.c.id.in_(chunk)))
+        counts["deleted"] = len(removed)
+
+    return counts
+
+
+def iter_jmdict_records(path: Path = JMDICT_PATH):
+    for entry, _ in iter_jmdict_entries(path):
+        record = parse_entry(entry)
+        if record is not None:
+            yield record
+
+
+def iter_kanjidic_records(path: Path = KANJIDIC_PATH):
+    root = ET.parse(path).getroot()
+    for char_elem in root.iter('character'):
+        record = parse_character(char_elem)
+        if record is not None:
+            yield record
+
+
+def update_dictionaries(jmdict: bool = True, kanjidic: bool = True):
+    """Refresh JMdict and/or KANJIDIC data in place"""
+    init_db()
+    any_changes = False
+
+    jobs = []
+    if jmdict:
+        jobs.append((JMDICT_SPEC, JMDICT_PATH, iter_jmdict_records))
+    if kanjidic:
+        jobs.append((KANJIDIC_SPEC, KANJIDIC_PATH, iter_kanjidic_records))
+
+    for spec, path, iter_records in jobs:
+        if not path.exists():
+            raise FileNotFoundError(f"{spec.label} file not found: {path}")
+
+        print(f"  Refreshing {spec.label} from {path}...")
+        started = time.perf_counter()
+        counts = refresh(spec, iter_records(path))
+        changed = bool(counts["added"] or counts["updated"] or counts["deleted"])
+        any_changes = any_changes or changed
+        if changed and spec is JMDICT_SPEC:
+            print("  Rebuilding gloss search index...")
+            rebuild_search_index()
+            if Path(DICTIONARY_BIN_PATH).exists():
+                # Servers reopen the file once it has been replaced
+                compile_dictionary(Path(DICTIONARY_BIN_PATH))
+        print(f"✓ {spec.label}: {counts['added']} added, {counts['updated']} updated, "
+              f"{counts['deleted']} deleted, {counts['unchanged']} unchanged "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    if any_changes:
+        # Let running servers know their cached lookups are stale
+        bump_data_version()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally refresh dictionary data")
+    parser.add_argument("--jmdict-only", action="store_true", help="Only refresh JMdict")
+    parser.add_argument("--kanjidic-only", action="store_true", help="Only refresh KANJIDIC")
+    args = parser.parse_args()
+    update_dictionaries(
+        jmdict=not args.kanjidic_only,
+        kanjidic=not args.jmdict_only
+    )